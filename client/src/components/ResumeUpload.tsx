@@ -5,6 +5,11 @@ import { useNavigate } from 'react-router-dom';
 import { Play } from 'lucide-react';
 import { API_BASE_URL } from '../config';
 
+const JOB_POLL_INTERVAL_MS = 1500;
+const JOB_POLL_LIMIT_MS = 3 * 60 * 1000;
+const JOB_MAX_RETRIES = 2;
+const JOB_OVERDUE_MESSAGE = 'Your resume is still being processed. Please check back in a few minutes.';
+
 interface ResumeUploadProps {
     initialData?: any;
     resumeId?: number;
@@ -34,6 +39,34 @@ const ResumeUpload = ({ initialData, resumeId: initialResumeId, isTestCompleted
         }
     };
 
+    // Uploads are processed in the background; poll the job until it finishes.
+    // A failed or overdue job is retried (it resumes at the stage it stopped at)
+    // a couple of times before giving up.
+    const waitForJob = async (jobId: number) => {
+        let retries = 0;
+        let deadline = Date.now() + JOB_POLL_LIMIT_MS;
+        while (true) {
+            await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+            const res = await axios.get(`${API_BASE_URL}/resumes/jobs/${jobId}`);
+            if (res.data.status === 'completed') return res.data;
+
+            const failed = res.data.status === 'failed';
+            if (!failed && Date.now() < deadline) continue;
+            if (retries >= JOB_MAX_RETRIES) {
+                throw new Error(failed ? (res.data.error || 'Resume processing failed') : JOB_OVERDUE_MESSAGE);
+            }
+            retries += 1;
+            try {
+                await axios.post(`${API_BASE_URL}/resumes/jobs/${jobId}/retry`);
+            } catch (error: any) {
+                // 409: the server still considers the job in progress
+                if (error.response?.status === 409) throw new Error(JOB_OVERDUE_MESSAGE);
+                throw error;
+            }
+            deadline = Date.now() + JOB_POLL_LIMIT_MS;
+        }
+    };
+
     const handleUpload = async () => {
         if (!file) return;
         setIsUploading(true);
@@ -47,34 +80,29 @@ const ResumeUpload = ({ initialData, resumeId: initialResumeId, isTestCompleted
                     'Content-Type': 'multipart/form-data',
                 },
             });
+            const job = await waitForJob(response.data.job_id);
             toast.success('Resume uploaded and parsed!');
-            setParsedData(response.data.parsed_data);
-            setResumeId(response.data.resume_id); // Capture resume_id
+            setParsedData(job.parsed_data);
+            setResumeId(job.resume_id); // Capture resume_id
         } catch (error: any) {
-            toast.error(error.response?.data?.detail || 'Upload failed');
+            toast.error(error.response?.data?.detail || error.message || 'Upload failed');
         } finally {
             setIsUploading(false);
         }
     };
 
     const handleTakeTest = async () => {
-        setIsGeneratingTest(true);
-        try {
-
-            const testRes = await axios.post(`${API_BASE_URL}/tests/generate?resume_id=${resumeId}`);
-
-            navigate('/test', {
-                state: {
-                    testId: testRes.data.test_id,
-                    questions: testRes.data.questions
-                }
-            });
-
-        } catch (error) {
+        if (!resumeId) {
             toast.error("Could not generate test. Please upload a resume first.");
-        } finally {
-            setIsGeneratingTest(false);
+            return;
         }
+        setIsGeneratingTest(true);
+        // The test page streams questions in as they are generated
+        navigate('/test', {
+            state: {
+                resumeId
+            }
+        });
     };
 
     return (
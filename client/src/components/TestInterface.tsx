@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { useLocation, useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import { toast } from 'react-hot-toast';
@@ -17,7 +17,12 @@ interface Question {
 const TestInterface = () => {
     const location = useLocation();
     const navigate = useNavigate();
-    const { testId, questions } = location.state || {}; // Duration in minutes (optional)
+    const { testId: initialTestId, questions: initialQuestions, resumeId } = location.state || {}; // Duration in minutes (optional)
+
+    const [testId, setTestId] = useState<number | undefined>(initialTestId);
+    const testIdRef = useRef<number | undefined>(initialTestId); // Read by the timer's auto-submit
+    const [questions, setQuestions] = useState<Question[] | undefined>(initialQuestions);
+    const [isStreaming, setIsStreaming] = useState<boolean>(!initialQuestions && !!resumeId);
 
     const [answers, setAnswers] = useState<Record<number, string>>({});
     const [timeLeft, setTimeLeft] = useState<number>(30 * 60); // 30 mins default
@@ -39,7 +44,7 @@ const TestInterface = () => {
             };
             // Note: Updated to send JSON body correctly. Before it was just 'answers'.
             // The backend endpoint signature will need to match this structure.
-            const res = await axios.post(`${API_BASE_URL}/tests/submit?test_id=${testId}`, payload);
+            const res = await axios.post(`${API_BASE_URL}/tests/submit?test_id=${testIdRef.current ?? testId}`, payload);
             navigate('/results', { state: { result: res.data } });
             toast.success("Test submitted!");
         } catch (error: any) {
@@ -48,8 +53,60 @@ const TestInterface = () => {
         }
     };
 
+    // Questions arrive in batches (NDJSON) as each skill's set is ready
     useEffect(() => {
-        if (!testId || !questions) {
+        if (initialQuestions || !resumeId) return;
+        const controller = new AbortController();
+
+        const streamTest = async () => {
+            try {
+                const res = await fetch(`${API_BASE_URL}/tests/generate/stream?resume_id=${resumeId}`, {
+                    method: 'POST',
+                    headers: { Authorization: String(axios.defaults.headers.common['Authorization'] || '') },
+                    signal: controller.signal
+                });
+                if (!res.ok || !res.body) {
+                    const body = await res.json().catch(() => ({}));
+                    throw new Error(body.detail || 'Could not generate test');
+                }
+
+                const reader = res.body.getReader();
+                const decoder = new TextDecoder();
+                let buffer = '';
+                while (true) {
+                    const { done, value } = await reader.read();
+                    if (done) break;
+                    buffer += decoder.decode(value, { stream: true });
+                    const lines = buffer.split('\n');
+                    buffer = lines.pop() || '';
+                    for (const line of lines) {
+                        if (!line.trim()) continue;
+                        const event = JSON.parse(line);
+                        if (event.event === 'test') {
+                            testIdRef.current = event.test_id;
+                            setTestId(event.test_id);
+                        } else if (event.event === 'questions') {
+                            setQuestions(prev => [...(prev || []), ...event.questions]);
+                        } else if (event.event === 'done') {
+                            setIsStreaming(false);
+                        } else if (event.event === 'error') {
+                            throw new Error(event.detail);
+                        }
+                    }
+                }
+            } catch (error: any) {
+                if (controller.signal.aborted) return;
+                toast.error(error.message || "Could not generate test. Please upload a resume first.");
+                navigate('/dashboard');
+            }
+        };
+
+        streamTest();
+        return () => controller.abort();
+    }, []);
+
+    useEffect(() => {
+        if ((!initialTestId || !initialQuestions) && !resumeId) {
             toast.error("Invalid test session");
             navigate('/dashboard');
         }
@@ -121,7 +178,13 @@ const TestInterface = () => {
         return `${mins}:${secs < 10 ? '0' : ''}${secs}`;
     };
 
-    if (!questions) return null;
+    if (!questions) {
+        return (
+            <div className="min-h-screen bg-slate-900 text-slate-400 flex items-center justify-center">
+                {isStreaming ? 'Generating your test...' : null}
+            </div>
+        );
+    }
 
     return (
         <div className="min-h-screen bg-slate-900 text-white p-6">
@@ -134,10 +197,10 @@ const TestInterface = () => {
                 </div>
                 <button
                     onClick={handleFinishClick}
-                    disabled={isSubmitting}
+                    disabled={isSubmitting || isStreaming}
                     className="bg-green-600 hover:bg-green-700 px-6 py-2 rounded-lg font-bold transition flex items-center gap-2"
                 >
-                    {isSubmitting ? 'Submitting...' : 'Finish Test'} <CheckCircle size={18} />
+                    {isSubmitting ? 'Submitting...' : isStreaming ? 'Loading questions...' : 'Finish Test'} <CheckCircle size={18} />
                 </button>
             </header>
 
@@ -148,7 +211,7 @@ const TestInterface = () => {
                         key={q.id}
                         initial={{ opacity: 0, y: 20 }}
                         animate={{ opacity: 1, y: 0 }}
-                        transition={{ delay: idx * 0.1 }}
+                        transition={{ delay: Math.min(idx, 10) * 0.1 }}
                         className="bg-slate-800 p-6 rounded-xl border border-slate-700 hover:border-blue-500/30 transition-all"
                     >
                         <div className="flex justify-between items-start mb-4">
@@ -23,6 +23,9 @@ const Dashboard = () => {
     const { user } = useAuth();
     const [resume, setResume] = useState<any>(null);
     const [recruiterData, setRecruiterData] = useState<any[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    // Filter and sort the loaded page came from; a cursor is only valid with these
+    const [pageParams, setPageParams] = useState('');
 
     const [filterSkill, setFilterSkill] = useState('');
     const [sortBy, setSortBy] = useState('date_desc');
@@ -45,14 +48,21 @@ const Dashboard = () => {
         fetchData();
     }, [user]);
 
-    const fetchApplicants = async () => {
+    const fetchApplicants = async (cursor?: string) => {
         try {
-            const params = new URLSearchParams();
-            if (filterSkill) params.append('skill', filterSkill);
-            params.append('sort_by', sortBy);
+            // Load More keeps the first page's filter and sort, even if the inputs have changed since
+            const params = new URLSearchParams(cursor ? pageParams : undefined);
+            if (!cursor) {
+                if (filterSkill) params.append('skill', filterSkill);
+                params.append('sort_by', sortBy);
+            }
+            const query = params.toString();
+            if (cursor) params.append('cursor', cursor);
 
             const response = await axios.get(`${API_BASE_URL}/recruiter/applicants?${params.toString()}`);
-            setRecruiterData(response.data);
+            setRecruiterData(cursor ? [...recruiterData, ...response.data] : response.data);
+            setNextCursor(response.headers['x-next-cursor'] || null);
+            setPageParams(query);
         } catch (error) {
             console.error("Failed to fetch applicants", error);
             toast.error("Could not fetch applicants");
@@ -182,7 +192,7 @@ const Dashboard = () => {
                                 </div>
 
                                 <button
-                                    onClick={fetchApplicants}
+                                    onClick={() => fetchApplicants()}
                                     className="px-4 py-2 bg-white hover:bg-slate-200 text-[#030712] text-sm font-semibold rounded-lg transition-colors border border-transparent"
                                 >
                                     Refresh Data
@@ -292,6 +302,16 @@ const Dashboard = () => {
                                             ))}
                                         </tbody>
                                     </table>
+                                    {nextCursor && (
+                                        <div className="p-4 text-center border-t border-white/5">
+                                            <button
+                                                onClick={() => fetchApplicants(nextCursor)}
+                                                className="px-4 py-2 bg-[#151b2e] hover:bg-[#1f2937] text-slate-300 text-sm font-medium rounded-lg border border-white/10 transition-colors"
+                                            >
+                                                Load More
+                                            </button>
+                                        </div>
+                                    )}
                                 </div>
                             )}
                         </div>
@@ -0,0 +1,110 @@
+import datetime
+from sqlalchemy import and_, desc, func
+from sqlalchemy.orm import Session
+import models
+
+def _get_for_update(db: Session, user_id: int):
+    # Row lock so concurrent uploads/submissions for one applicant serialize (no-op on SQLite)
+    return (
+        db.query(models.ApplicantSummary)
+        .filter(models.ApplicantSummary.user_id == user_id)
+        .with_for_update()
+        .first()
+    )
+
+def create_summary(user: models.User):
+    """
+    Attaches an empty summary to a newly created applicant (saved with the user).
+    """
+    user.summary = models.ApplicantSummary(
+        last_upload_at=user.created_at or datetime.datetime.utcnow()
+    )
+
+def record_resume(db: Session, resume: models.Resume):
+    """
+    Points the owner's summary at a freshly flushed resume. A new resume has no
+    test yet, so the score fields are reset. Caller commits.
+    """
+    summary = _get_for_update(db, resume.user_id)
+    if summary is None:
+        summary = models.ApplicantSummary(user_id=resume.user_id)
+        db.add(summary)
+    elif summary.resume_id is not None and summary.last_upload_at > resume.created_at:
+        return summary
+
+    summary.resume_id = resume.id
+    summary.experience_years = resume.experience_years or 0
+    summary.last_upload_at = resume.created_at
+    summary.test_result_id = None
+    summary.score = 0
+    summary.trust_score = None
+    summary.test_taken_at = None
+    return summary
+
+def record_test_result(db: Session, result: models.TestResult):
+    """
+    Copies a freshly flushed test result onto the summary if it belongs to the
+    applicant's current resume. Caller commits.
+    """
+    summary = _get_for_update(db, result.user_id)
+    if summary is None or summary.resume_id != result.resume_id:
+        return summary
+
+    summary.test_result_id = result.id
+    summary.score = result.score or 0
+    summary.trust_score = result.trust_score
+    summary.test_taken_at = result.created_at
+    return summary
+
+def rebuild_summaries(db: Session, user_ids: list):
+    """
+    Recomputes summaries from the resumes/test_results tables for the given
+    applicants in one query. Used for backfills and self-healing. Caller commits.
+    """
+    if not user_ids:
+        return []
+
+    # Rank resumes per user and results per resume newest first; row 1 is the latest.
+    latest_resumes = db.query(
+        models.Resume.id.label("resume_id"),
+        models.Resume.user_id.label("user_id"),
+        func.row_number().over(
+            partition_by=models.Resume.user_id,
+            order_by=(desc(models.Resume.created_at), desc(models.Resume.id))
+        ).label("row_num")
+    ).filter(models.Resume.user_id.in_(user_ids)).subquery()
+
+    latest_results = db.query(
+        models.TestResult.id.label("result_id"),
+        models.TestResult.resume_id.label("resume_id"),
+        func.row_number().over(
+            partition_by=models.TestResult.resume_id,
+            order_by=(desc(models.TestResult.created_at), desc(models.TestResult.id))
+        ).label("row_num")
+    ).filter(models.TestResult.user_id.in_(user_ids)).subquery()
+
+    rows = (
+        db.query(models.User, models.Resume, models.TestResult, models.ApplicantSummary)
+        .outerjoin(latest_resumes, and_(latest_resumes.c.user_id == models.User.id, latest_resumes.c.row_num == 1))
+        .outerjoin(models.Resume, models.Resume.id == latest_resumes.c.resume_id)
+        .outerjoin(latest_results, and_(latest_results.c.resume_id == models.Resume.id, latest_results.c.row_num == 1))
+        .outerjoin(models.TestResult, models.TestResult.id == latest_results.c.result_id)
+        .outerjoin(models.ApplicantSummary, models.ApplicantSummary.user_id == models.User.id)
+        .filter(models.User.id.in_(user_ids), models.User.role == "applicant")
+        .all()
+    )
+
+    summaries = []
+    for user, resume, result, summary in rows:
+        if summary is None:
+            summary = models.ApplicantSummary(user_id=user.id)
+            db.add(summary)
+        summary.resume_id = resume.id if resume else None
+        summary.experience_years = (resume.experience_years or 0) if resume else 0
+        summary.last_upload_at = resume.created_at if resume else user.created_at
+        summary.test_result_id = result.id if result else None
+        summary.score = (result.score or 0) if result else 0
+        summary.trust_score = result.trust_score if result else None
+        summary.test_taken_at = result.created_at if result else None
+        summaries.append(summary)
+    return summaries
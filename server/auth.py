@@ -3,9 +3,11 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
 import models, schemas, database
+from password_hashing import pwd_context
+from cache_utils import TTLCache
 import os
 from dotenv import load_dotenv
 
@@ -15,9 +17,18 @@ SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 # 1 day
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Token email -> User, so authenticated requests skip the lookup. Entries are dropped
+# when this process commits a change to the user; changes made by other processes
+# are seen after at most the TTL (0 disables the cache).
+USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "60"))
+
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+_user_cache_generation = 0 # Bumped on every invalidation, see get_current_user
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Blocking; request handlers use password_hashing.hasher instead
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -34,7 +45,55 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(database.get_db)):
+def get_user_by_email(db: Session, email: str):
+    return db.query(models.User).filter(models.User.email == email).first()
+
+def invalidate_cached_user(email: str = None):
+    """
+    Drops one cached identity, or all of them.
+    """
+    global _user_cache_generation
+    _user_cache_generation += 1
+    if email is None:
+        user_cache.clear()
+    else:
+        user_cache.pop(email)
+
+# Invalidation happens after commit, so a concurrent request can't re-cache the old row
+def _pending_invalidations(session: Session) -> set:
+    return session.info.setdefault("invalidate_users", set())
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _user_changed(mapper, connection, target):
+    session = object_session(target)
+    if session is None:
+        invalidate_cached_user()
+        return
+    history = inspect(target).attrs.email.history
+    _pending_invalidations(session).update(e for e in (target.email, *history.deleted) if e)
+
+@event.listens_for(Session, "do_orm_execute")
+def _users_bulk_changed(state):
+    # query(User).update()/delete() skip the mapper events above
+    if (state.is_update or state.is_delete) and state.bind_mapper is inspect(models.User):
+        _pending_invalidations(state.session).add(None)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    emails = session.info.pop("invalidate_users", None)
+    if emails:
+        if None in emails:
+            invalidate_cached_user()
+        else:
+            for email in emails:
+                invalidate_cached_user(email)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(session):
+    session.info.pop("invalidate_users", None)
+
+async def get_current_user(token: str = Depends(oauth2_scheme), runner: database.SessionRunner = Depends(database.get_runner)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -49,7 +108,24 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     except JWTError:
         raise credentials_exception
     
-    user = db.query(models.User).filter(models.User.email == token_data.email).first()
+    user = user_cache.get(token_data.email) if USER_CACHE_TTL_SECONDS > 0 else None
+    if user is not None:
+        return user
+
+    generation = _user_cache_generation
+    user = await runner.run(get_user_by_email, token_data.email)
     if user is None:
         raise credentials_exception
+    # The session is closed by now, so the instance is detached with its columns loaded.
+    # Skip caching if an invalidation ran while we were reading.
+    if USER_CACHE_TTL_SECONDS > 0 and generation == _user_cache_generation:
+        user_cache.set(token_data.email, user)
     return user
+
+# Operators allowed on /admin (comma-separated emails); empty means nobody
+ADMIN_EMAILS = {e.strip().lower() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e.strip()}
+
+async def get_current_admin(current_user: models.User = Depends(get_current_user)):
+    if current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+    return current_user
@@ -0,0 +1,45 @@
+import models
+import database
+import migrate
+from sqlalchemy.orm import Session
+from applicant_summary import rebuild_summaries
+
+BATCH_SIZE = 500
+
+# Migration 0004 fills these on upgrade; this rebuilds them, e.g. after rows were
+# edited outside the app.
+def backfill_applicant_summaries():
+    migrate.require_current()
+
+    db: Session = database.SessionLocal()
+    try:
+        last_id = 0
+        total = 0
+        while True:
+            user_ids = [
+                user_id for (user_id,) in db.query(models.User.id)
+                .filter(models.User.role == "applicant", models.User.id > last_id)
+                .order_by(models.User.id)
+                .limit(BATCH_SIZE)
+                .all()
+            ]
+            if not user_ids:
+                break
+
+            rebuild_summaries(db, user_ids)
+            db.commit()
+
+            last_id = user_ids[-1]
+            total += len(user_ids)
+            print(f"Processed {total} applicants (up to id {last_id})")
+
+        print(f"✅ Rebuilt summaries for {total} applicants.")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_applicant_summaries()
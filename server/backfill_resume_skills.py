@@ -0,0 +1,47 @@
+import models
+import database
+import migrate
+from sqlalchemy.orm import Session, selectinload
+from resume_service import apply_parsed_fields
+
+BATCH_SIZE = 500
+
+# Migration 0003 fills these on upgrade; this rebuilds them for every resume, e.g.
+# after a change to how skills are normalized.
+def backfill_resume_skills():
+    migrate.require_current()
+
+    db: Session = database.SessionLocal()
+    try:
+        last_id = 0
+        total = 0
+        while True:
+            batch = (
+                db.query(models.Resume)
+                .options(selectinload(models.Resume.skills))
+                .filter(models.Resume.id > last_id)
+                .order_by(models.Resume.id)
+                .limit(BATCH_SIZE)
+                .all()
+            )
+            if not batch:
+                break
+
+            for resume in batch:
+                apply_parsed_fields(resume, resume.parsed_content)
+            db.commit()
+
+            last_id = batch[-1].id
+            total += len(batch)
+            print(f"Processed {total} resumes (up to id {last_id})")
+
+        print(f"✅ Backfilled skills and experience for {total} resumes.")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_resume_skills()
@@ -0,0 +1,87 @@
+import argparse
+import statistics
+import time
+from sqlalchemy import create_engine, desc, event
+from sqlalchemy.orm import sessionmaker
+import models
+from routes import recruiter_routes
+from benchmarks.seed import reset_schema, seed_applicants
+
+# Benchmarks GET /recruiter/applicants: SQL statements issued and latency per call,
+# for the current implementation (one page per sort order) and the previous
+# per-applicant (N+1) loop that returned everyone at once.
+#
+# Run from the server directory, e.g.:
+#     python -m benchmarks.bench_applicants --sizes 1000 10000 100000
+#     python -m benchmarks.bench_applicants --database-url postgresql://... --sizes 1000
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+def legacy_get_all_applicants(db):
+    """
+    The pre-join implementation: one resume query and one result query per applicant.
+    """
+    applicants = db.query(models.User).filter(models.User.role == "applicant").all()
+    applicant_data = []
+    for app in applicants:
+        latest_resume = db.query(models.Resume).filter(models.Resume.user_id == app.id).order_by(desc(models.Resume.created_at)).first()
+        test_result = None
+        if latest_resume:
+            test_result = db.query(models.TestResult).filter(models.TestResult.resume_id == latest_resume.id).first()
+        applicant_data.append((app, latest_resume, test_result))
+    return applicant_data
+
+def current_get_all_applicants(sort_by, limit):
+    def run(db):
+        applicants, _ = recruiter_routes.list_applicants(db, sort_by=sort_by, limit=limit)
+        return applicants
+    return run
+
+def measure(label, fn, Session, counter, repeat):
+    timings = []
+    queries = 0
+    rows = 0
+    for _ in range(repeat):
+        db = Session()
+        try:
+            counter.count = 0
+            start = time.perf_counter()
+            rows = len(fn(db))
+            timings.append(time.perf_counter() - start)
+            queries = counter.count
+        finally:
+            db.close()
+    print(f"  {label:<16} rows={rows:<7} queries={queries:<7} median={statistics.median(timings) * 1000:9.1f} ms  best={min(timings) * 1000:9.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recruiter applicant listing.")
+    parser.add_argument("--database-url", default="sqlite:///bench.db", help="Database to seed (it is wiped first).")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--legacy-max", type=int, default=5000, help="Skip the N+1 implementation above this size.")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    counter = QueryCounter(engine)
+
+    for size in args.sizes:
+        reset_schema(engine)
+        seed_applicants(engine, size)
+        print(f"\n{size} applicants ({engine.dialect.name})")
+        for sort_by in recruiter_routes.SORT_OPTIONS:
+            measure(sort_by, current_get_all_applicants(sort_by, args.page_size), Session, counter, args.repeat)
+        if size <= args.legacy_max:
+            measure("legacy", legacy_get_all_applicants, Session, counter, args.repeat)
+        else:
+            print("  legacy           skipped (--legacy-max)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+from sqlalchemy import create_engine
+from benchmarks.seed import reset_schema, seed_applicants
+
+# Load-tests the API with the sync engine (threadpool) and with DB_ASYNC=true,
+# reporting requests/sec and latency percentiles at a given concurrency.
+#
+# Each mode runs a real uvicorn server in a subprocess against the same seeded
+# database, with the LLM stub provider so no external calls are made.
+#
+# Run from the server directory, e.g.:
+#     python -m benchmarks.bench_async --applicants 1000 --concurrency 200 --requests 4000
+#     python -m benchmarks.bench_async --database-url postgresql://... --path "/resumes/my-resume"
+
+def start_server(database_url: str, async_mode: bool, port: int, workers: int, extra_env: dict = None) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": database_url,
+        "DB_ASYNC": "true" if async_mode else "false",
+        "LLM_PROVIDER": "stub",
+        **(extra_env or {}),
+    })
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL
+    )
+
+def wait_until_up(base_url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+async def load(base_url: str, path: str, token: str, concurrency: int, total: int):
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        headers={"Authorization": f"Bearer {token}"},
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        timeout=60
+    ) as client:
+        async def worker():
+            nonlocal errors
+            for _ in remaining:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    if response.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50": latencies[len(latencies) // 2] * 1000,
+        "p95": latencies[int(len(latencies) * 0.95)] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+        "mean": statistics.mean(latencies) * 1000,
+        "errors": errors,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare requests/sec of the sync and async database paths.")
+    parser.add_argument("--database-url", default="sqlite:///bench.db")
+    parser.add_argument("--applicants", type=int, default=1000)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in the database")
+    parser.add_argument("--path", default="/recruiter/applicants?limit=20")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if not args.skip_seed:
+        reset_schema(engine)
+        seed_applicants(engine, args.applicants)
+
+    os.environ.setdefault("DATABASE_URL", args.database_url)
+    import auth # After DATABASE_URL is set: auth imports the database module
+    token = auth.create_access_token(data={"sub": "recruiter@bench.local", "role": "recruiter", "username": "bench_recruiter"})
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    print(f"GET {args.path}  concurrency={args.concurrency}  requests={args.requests}  ({engine.dialect.name})")
+    for mode in args.modes:
+        server = start_server(args.database_url, mode == "async", args.port, args.workers)
+        try:
+            wait_until_up(base_url)
+            asyncio.run(load(base_url, args.path, token, min(args.concurrency, 20), 200)) # Warm up pools
+            result = asyncio.run(load(base_url, args.path, token, args.concurrency, args.requests))
+        finally:
+            server.terminate()
+            server.wait()
+        print(
+            f"  {mode:6} {result['rps']:8.1f} req/s  mean={result['mean']:7.1f} ms  p50={result['p50']:7.1f} ms"
+            f"  p95={result['p95']:7.1f} ms  p99={result['p99']:7.1f} ms  errors={result['errors']}"
+        )
@@ -0,0 +1,292 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import defaultdict
+import httpx
+from sqlalchemy import create_engine
+from benchmarks.bench_async import start_server, wait_until_up
+from benchmarks.seed import reset_schema, seed_applicants
+from skills import ALLOWED_SKILLS
+
+# End-to-end load test: virtual applicants go through signup -> login -> upload ->
+# (poll the parsing job) -> generate test -> submit, while recruiters page through
+# /recruiter/applicants, against a database seeded with --applicants synthetic
+# applicants. Reports throughput, p50/p95/p99 latency and SQL statements per
+# request for each endpoint, in each database mode.
+#
+# Servers are real uvicorn processes (see bench_async) with the LLM and storage
+# stubbed out (LLM_PROVIDER=stub, STORAGE_PROVIDER=stub), so nothing external is
+# called; --llm-latency-ms and --storage-latency-ms set the simulated latency.
+# Query counts come from the server's /metrics, so they are exact with one worker
+# only. Other server settings (ARGON2_*, DB_POOL_SIZE, ...) are taken from the
+# environment as usual.
+#
+# --save writes the results as JSON; --baseline compares against such a file and
+# exits with status 1 if an endpoint's p95 grew by more than --max-regression or
+# it now issues more SQL statements per request.
+#
+# Run from the server directory, e.g.:
+#     python -m benchmarks.bench_e2e --applicants 1000 --users 100 --concurrency 20
+#     python -m benchmarks.bench_e2e --save baseline.json
+#     python -m benchmarks.bench_e2e --baseline baseline.json --max-regression 0.25
+#     python -m benchmarks.bench_e2e --database-url postgresql://... --modes async
+
+# Endpoints in report order, named by route template as in /metrics
+ENDPOINTS = (
+    ("POST", "/auth/signup"),
+    ("POST", "/auth/login"),
+    ("POST", "/resumes/upload"),
+    ("GET", "/resumes/jobs/{job_id}"),
+    ("POST", "/tests/generate"),
+    ("POST", "/tests/submit"),
+    ("GET", "/recruiter/applicants"),
+)
+JOB_POLL_SECONDS = 0.1
+JOB_TIMEOUT_SECONDS = 120
+# Means are fractional (e.g. an identity cache miss on a session's first request),
+# so only about one more statement per request counts as a regression
+QUERY_TOLERANCE = 0.5
+
+_QUERIES_LINE = re.compile(r'^http_request_db_queries_(sum|count)\{method="([^"]+)",route="([^"]+)"\} (\S+)$')
+
+class FlowFailed(Exception):
+    pass
+
+class Recorder:
+    """
+    Latencies and errors per (method, route).
+    """
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, method: str, route: str, url: str, expect=(200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.errors[(method, route)] += 1
+            raise FlowFailed(f"{method} {route}: {e!r}")
+        finally:
+            self.latencies[(method, route)].append(time.perf_counter() - started)
+        if response.status_code not in expect:
+            self.errors[(method, route)] += 1
+            raise FlowFailed(f"{method} {route}: HTTP {response.status_code} {response.text[:200]}")
+        return response
+
+def resume_text(rng: random.Random, n: int) -> bytes:
+    # Distinct per user so the resume caches don't short-circuit parsing
+    skills = rng.sample(ALLOWED_SKILLS, 3)
+    return (
+        f"Benchmark Applicant {n}\n"
+        f"Software engineer, {2024 - rng.randint(1, 15)} - 2024. Worked with {', '.join(skills)}.\n"
+        f"Reference {rng.getrandbits(64):x}\n"
+    ).encode()
+
+async def applicant_flow(client: httpx.AsyncClient, recorder: Recorder, run_id: str, n: int, rng: random.Random):
+    email = f"load{run_id}_{n}@example.com"
+    await recorder.request(client, "POST", "/auth/signup", "/auth/signup", json={
+        "username": f"load{run_id}_{n}", "email": email, "password": "bench-password", "role": "applicant"
+    })
+    response = await recorder.request(client, "POST", "/auth/login", "/auth/login", data={
+        "username": email, "password": "bench-password"
+    })
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = await recorder.request(
+        client, "POST", "/resumes/upload", "/resumes/upload", expect=(202,), headers=headers,
+        files={"file": (f"resume_{n}.txt", resume_text(rng, n), "text/plain")}
+    )
+    job_id = response.json()["job_id"]
+    deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+    while True:
+        job = (await recorder.request(client, "GET", "/resumes/jobs/{job_id}", f"/resumes/jobs/{job_id}", headers=headers)).json()
+        if job["status"] == "completed":
+            break
+        if job["status"] == "failed" or time.monotonic() > deadline:
+            raise FlowFailed(f"resume job {job_id} {job['status']}: {job.get('error')}")
+        await asyncio.sleep(JOB_POLL_SECONDS)
+
+    test = (await recorder.request(
+        client, "POST", "/tests/generate", f"/tests/generate?resume_id={job['resume_id']}", headers=headers
+    )).json()
+    answers = {str(q["id"]): rng.choice(q["options"]) for q in test["questions"] if q.get("options")}
+    await recorder.request(
+        client, "POST", "/tests/submit", f"/tests/submit?test_id={test['test_id']}", headers=headers,
+        json={"answers": answers, "trust_metrics": {"tab_switches": rng.randint(0, 2)}}
+    )
+
+async def recruiter_flow(client: httpx.AsyncClient, recorder: Recorder, token: str, pages: int):
+    headers = {"Authorization": f"Bearer {token}"}
+    path = "/recruiter/applicants?limit=20"
+    for _ in range(pages):
+        response = await recorder.request(client, "GET", "/recruiter/applicants", path, headers=headers)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        path = f"/recruiter/applicants?limit=20&cursor={cursor}"
+
+async def run_load(base_url: str, recruiter_token: str, users: int, concurrency: int, recruiter_share: float,
+                   recruiter_pages: int, seed: int):
+    recorder = Recorder()
+    rng = random.Random(seed)
+    run_id = f"{int(time.time())}{rng.randrange(1000):03d}" # Fresh emails on every run against the same database
+    # Each slot runs one flow at a time; a recruiter_share of flows are recruiter sessions
+    flows = iter(range(users))
+    failures = []
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        timeout=120
+    ) as client:
+        async def worker(worker_rng: random.Random):
+            for n in flows:
+                try:
+                    if worker_rng.random() < recruiter_share:
+                        await recruiter_flow(client, recorder, recruiter_token, recruiter_pages)
+                    else:
+                        await applicant_flow(client, recorder, run_id, n, worker_rng)
+                except FlowFailed as e:
+                    failures.append(str(e))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(random.Random(rng.random())) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return recorder, elapsed, failures
+
+def scrape_query_counts(base_url: str) -> dict:
+    """
+    (method, route) -> [sum, count] of http_request_db_queries.
+    """
+    totals = defaultdict(lambda: [0.0, 0])
+    for line in httpx.get(f"{base_url}/metrics", timeout=30).text.splitlines():
+        match = _QUERIES_LINE.match(line)
+        if match:
+            kind, method, route, value = match.groups()
+            totals[(method, route)][0 if kind == "sum" else 1] += float(value)
+    return totals
+
+def percentile(values: list, p: float) -> float:
+    return values[min(len(values) - 1, int(p * len(values)))] if values else 0.0
+
+def summarize(recorder: Recorder, elapsed: float, before: dict, after: dict) -> dict:
+    results = {}
+    for key in ENDPOINTS:
+        latencies = sorted(recorder.latencies.get(key, []))
+        if not latencies:
+            continue
+        queries = None
+        if after is not None:
+            count = after[key][1] - before[key][1]
+            queries = (after[key][0] - before[key][0]) / count if count else None
+        results[f"{key[0]} {key[1]}"] = {
+            "requests": len(latencies),
+            "errors": recorder.errors.get(key, 0),
+            "rps": len(latencies) / elapsed,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000,
+            "queries_per_request": queries,
+        }
+    return results
+
+def print_results(mode: str, elapsed: float, flows: int, failures: list, results: dict):
+    print(f"  {mode}: {flows} flows in {elapsed:.1f} s ({flows / elapsed:.1f} flows/s), {len(failures)} failed")
+    for endpoint, r in results.items():
+        queries = f"{r['queries_per_request']:5.1f}" if r["queries_per_request"] is not None else "  n/a"
+        print(
+            f"    {endpoint:30} {r['requests']:6d} req {r['rps']:7.1f} req/s  p50={r['p50_ms']:7.1f} ms"
+            f"  p95={r['p95_ms']:7.1f} ms  p99={r['p99_ms']:7.1f} ms  queries={queries}  errors={r['errors']}"
+        )
+    for failure in failures[:5]:
+        print(f"    failed: {failure}")
+
+def regressions(results: dict, baseline: dict, max_regression: float) -> list:
+    found = []
+    for mode, endpoints in results.items():
+        for endpoint, r in endpoints.items():
+            base = baseline.get(mode, {}).get(endpoint)
+            if base is None:
+                continue
+            if r["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+                found.append(f"{mode} {endpoint}: p95 {base['p95_ms']:.1f} -> {r['p95_ms']:.1f} ms")
+            if (r["queries_per_request"] is not None and base.get("queries_per_request") is not None
+                    and r["queries_per_request"] > base["queries_per_request"] + QUERY_TOLERANCE):
+                found.append(f"{mode} {endpoint}: queries/request {base['queries_per_request']:.1f} -> {r['queries_per_request']:.1f}")
+    return found
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end load test of the applicant and recruiter flows.")
+    parser.add_argument("--database-url", default="sqlite:///bench.db")
+    parser.add_argument("--applicants", type=int, default=1000, help="synthetic applicants seeded before the run")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in the database")
+    parser.add_argument("--users", type=int, default=100, help="flows to run per mode")
+    parser.add_argument("--concurrency", type=int, default=20, help="flows in progress at once")
+    parser.add_argument("--recruiter-share", type=float, default=0.2, help="share of flows that are recruiter sessions")
+    parser.add_argument("--recruiter-pages", type=int, default=5, help="applicant pages a recruiter session reads")
+    parser.add_argument("--llm-latency-ms", type=float, default=200)
+    parser.add_argument("--storage-latency-ms", type=float, default=50)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--modes", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier --save to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed p95 growth against the baseline")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if not args.skip_seed:
+        reset_schema(engine)
+        seed_applicants(engine, args.applicants, seed=args.seed)
+
+    os.environ.setdefault("DATABASE_URL", args.database_url)
+    import auth # After DATABASE_URL is set: auth imports the database module
+    recruiter_token = auth.create_access_token(data={"sub": "recruiter@bench.local", "role": "recruiter", "username": "bench_recruiter"})
+
+    server_env = {
+        "STORAGE_PROVIDER": "stub",
+        "LLM_STUB_LATENCY_MS": str(args.llm_latency_ms),
+        "STORAGE_STUB_LATENCY_MS": str(args.storage_latency_ms),
+        "METRICS_TOKEN": "", # Scraped below
+        "PROFILE_SLOW_REQUEST_SECONDS": "0", # Keep the profiler's overhead out of the numbers
+    }
+    base_url = f"http://127.0.0.1:{args.port}"
+    print(
+        f"{args.users} flows  concurrency={args.concurrency}  recruiter share={args.recruiter_share}"
+        f"  seeded={'existing' if args.skip_seed else args.applicants}  ({engine.dialect.name})"
+    )
+    all_results = {}
+    for mode in args.modes:
+        server = start_server(args.database_url, mode == "async", args.port, args.workers, server_env)
+        try:
+            wait_until_up(base_url)
+            before = scrape_query_counts(base_url) if args.workers == 1 else None
+            recorder, elapsed, failures = asyncio.run(run_load(
+                base_url, recruiter_token, args.users, args.concurrency, args.recruiter_share, args.recruiter_pages, args.seed
+            ))
+            after = scrape_query_counts(base_url) if args.workers == 1 else None
+        finally:
+            server.terminate()
+            server.wait()
+        all_results[mode] = summarize(recorder, elapsed, before, after)
+        print_results(mode, elapsed, args.users, failures, all_results[mode])
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(all_results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(all_results, json.load(f), args.max_regression)
+        for line in found:
+            print(f"  REGRESSION {line}")
+        if found:
+            sys.exit(1)
+        print("  no regressions against the baseline")
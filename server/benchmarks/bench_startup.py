@@ -0,0 +1,87 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Measures cold-start time of `main:app`: each run imports it in a fresh
+# interpreter. --eager also builds every registered external client right after
+# the import, which is what every worker paid at startup before clients were
+# created lazily.
+#
+# Run from the server directory, e.g.:
+#     python -m benchmarks.bench_startup --runs 10
+#     python -m benchmarks.bench_startup --runs 10 --top 15
+
+IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+if {eager}:
+    from clients import registry
+    for name in registry.names():
+        registry.get(name)
+print(imported - started, time.perf_counter() - imported)
+"""
+
+def child_env(database_url: str) -> dict:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = database_url
+    # Dummy credentials so eager client construction succeeds; nothing connects
+    env.setdefault("SUPABASE_URL", "https://bench.supabase.co")
+    env.setdefault("SUPABASE_KEY", "bench")
+    env.setdefault("GEMINI_API_KEY", "bench")
+    env.setdefault("GROQ_API_KEY", "bench")
+    return env
+
+def run_once(env: dict, eager: bool):
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(eager=eager)],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    import_seconds, clients_seconds = map(float, output.strip().splitlines()[-1].split())
+    return import_seconds, clients_seconds
+
+def top_imports(env: dict, count: int):
+    # -X importtime lines: "import time: self [us] | cumulative | module"
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=env, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        if module.startswith("   ") and not module.startswith("     "):
+            rows.append((int(cumulative), module.strip())) # Direct imports of main only
+    return sorted(rows, reverse=True)[:count]
+
+def summarize(label: str, samples: list):
+    imports = [s[0] * 1000 for s in samples]
+    clients = [s[1] * 1000 for s in samples]
+    total = [i + c for i, c in zip(imports, clients)]
+    print(
+        f"  {label:6} import median={statistics.median(imports):7.1f} ms  min={min(imports):7.1f} ms"
+        f"  clients median={statistics.median(clients):7.1f} ms  total median={statistics.median(total):7.1f} ms"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold-start time of main:app, lazy vs eager clients.")
+    parser.add_argument("--database-url", default="sqlite:///bench.db")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest modules main imports directly")
+    args = parser.parse_args()
+
+    env = child_env(args.database_url)
+    run_once(env, False) # Warm the OS file cache and bytecode
+
+    print(f"import main  runs={args.runs}")
+    summarize("lazy", [run_once(env, False) for _ in range(args.runs)])
+    summarize("eager", [run_once(env, True) for _ in range(args.runs)])
+
+    if args.top:
+        print("slowest direct imports of main (cumulative):")
+        for cumulative, module in top_imports(env, args.top):
+            print(f"  {cumulative / 1000:7.1f} ms  {module}")
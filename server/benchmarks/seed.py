@@ -0,0 +1,122 @@
+import argparse
+import datetime
+import random
+from sqlalchemy import create_engine, insert
+import models
+from skills import ALLOWED_SKILLS, normalize_skill
+
+# Seeds a database with synthetic applicants, resumes and test results for benchmarks.
+#
+# Run from the server directory, e.g.:
+#     python -m benchmarks.seed --database-url sqlite:///bench.db --applicants 10000
+#
+# The target database is wiped first, so it is never taken from DATABASE_URL implicitly.
+
+BATCH_SIZE = 5000
+
+def reset_schema(engine):
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+
+def seed_applicants(engine, count: int, seed: int = 42, resumes_per_user: int = 2, tested_ratio: float = 0.7):
+    """
+    Inserts `count` applicants plus one recruiter. Every applicant gets `resumes_per_user`
+    resumes and a test result on the latest one with probability `tested_ratio`.
+    Returns the recruiter's email.
+    """
+    rng = random.Random(seed)
+    now = datetime.datetime.utcnow()
+
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{
+            "username": "bench_recruiter",
+            "email": "recruiter@bench.local",
+            "password_hash": "x",
+            "role": "recruiter",
+            "created_at": now,
+        }])
+
+        user_id = 1
+        resume_id = 0
+        result_id = 0
+        for start in range(0, count, BATCH_SIZE):
+            users, resumes, resume_skills, results, summaries = [], [], [], [], []
+            for _ in range(start, min(start + BATCH_SIZE, count)):
+                user_id += 1
+                joined = now - datetime.timedelta(days=rng.randint(30, 720))
+                users.append({
+                    "id": user_id,
+                    "username": f"applicant{user_id}",
+                    "email": f"applicant{user_id}@bench.local",
+                    "password_hash": "x",
+                    "role": "applicant",
+                    "created_at": joined,
+                })
+                for n in range(resumes_per_user):
+                    resume_id += 1
+                    skills = rng.sample(ALLOWED_SKILLS, rng.randint(1, 6))
+                    experience_years = rng.randint(0, 20)
+                    resumes.append({
+                        "id": resume_id,
+                        "user_id": user_id,
+                        "file_url": f"https://storage.bench.local/resume_{resume_id}.pdf",
+                        "parsed_content": {
+                            "skills": skills,
+                            "experience_years": experience_years,
+                            "summary": "Synthetic benchmark resume.",
+                        },
+                        "experience_years": experience_years,
+                        "created_at": joined + datetime.timedelta(days=n + 1, seconds=rng.randint(0, 86400)),
+                    })
+                    resume_skills.extend(
+                        {"resume_id": resume_id, "skill": normalize_skill(name), "name": name} for name in skills
+                    )
+                summary = {
+                    "user_id": user_id,
+                    "resume_id": resume_id if resumes_per_user else None,
+                    "experience_years": experience_years if resumes_per_user else 0,
+                    "test_result_id": None,
+                    "score": 0,
+                    "trust_score": None,
+                    "last_upload_at": resumes[-1]["created_at"] if resumes_per_user else joined,
+                    "test_taken_at": None,
+                }
+                if resumes_per_user and rng.random() < tested_ratio:
+                    result_id += 1
+                    results.append({
+                        "id": result_id,
+                        "user_id": user_id,
+                        "resume_id": resume_id,
+                        "score": round(rng.uniform(0, 100), 1),
+                        "trust_score": float(rng.choice([100, 90, 80, 70, 50])),
+                        "details": [],
+                        "created_at": now,
+                    })
+                    summary.update({
+                        "test_result_id": result_id,
+                        "score": results[-1]["score"],
+                        "trust_score": results[-1]["trust_score"],
+                        "test_taken_at": now,
+                    })
+                summaries.append(summary)
+            conn.execute(insert(models.User), users)
+            if resumes:
+                conn.execute(insert(models.Resume), resumes)
+                conn.execute(insert(models.ResumeSkill), resume_skills)
+            if results:
+                conn.execute(insert(models.TestResult), results)
+            conn.execute(insert(models.ApplicantSummary), summaries)
+
+    return "recruiter@bench.local"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed synthetic applicants for benchmarking.")
+    parser.add_argument("--database-url", default="sqlite:///bench.db")
+    parser.add_argument("--applicants", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    reset_schema(engine)
+    seed_applicants(engine, args.applicants, seed=args.seed)
+    print(f"✅ Seeded {args.applicants} applicants into {engine.url.render_as_string(hide_password=True)}")
@@ -1,9 +1,10 @@
-from supabase_utils import supabase
+from supabase_utils import get_supabase
 import sys
 
 def check_connection():
     try:
         print("🔄 Connecting to Supabase...")
+        supabase = get_supabase()
         
         # Try to list buckets to verify admin/service_role access
         print("📂 Listing Storage Buckets:")
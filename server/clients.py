@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+
+# Clients for external services (Supabase storage, the LLM provider) are built on
+# first use rather than at import, so workers, scripts and benchmarks that never
+# touch a service don't pay for its SDK import or need its credentials.
+
+logger = logging.getLogger(__name__)
+
+# Health results are reused for this long, so probing (/admin/clients?probe=true)
+# can't be used to hammer the upstream services
+HEALTH_CHECK_TTL_SECONDS = 30
+
+class _Entry:
+    def __init__(self, factory, health_check):
+        self.factory = factory
+        self.health_check = health_check
+        self.client = None
+        self.created_at = None
+        self.init_seconds = None
+        self.error = None # Last failed creation, retried on the next get()
+        self.health = None
+        self.lock = threading.Lock()
+
+class ClientRegistry:
+    """
+    register(name, factory, health_check) declares a client; get(name) builds it
+    once, thread-safely, and returns the same instance afterwards. health_check
+    takes the client and raises if the service is unusable.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def register(self, name: str, factory, health_check=None):
+        self._entries[name] = _Entry(factory, health_check)
+
+    def get(self, name: str):
+        entry = self._entries[name]
+        if entry.client is not None:
+            return entry.client
+        with entry.lock:
+            if entry.client is None:
+                started = time.perf_counter()
+                try:
+                    client = entry.factory()
+                except Exception as e:
+                    entry.error = f"{type(e).__name__}: {e}"
+                    raise
+                entry.init_seconds = time.perf_counter() - started
+                entry.created_at = time.time()
+                entry.error = None
+                entry.client = client
+                logger.info("Initialized %s client in %.0f ms", name, entry.init_seconds * 1000, extra={"client": name})
+        return entry.client
+
+    def names(self) -> list:
+        return list(self._entries)
+
+    def is_initialized(self, name: str) -> bool:
+        return self._entries[name].client is not None
+
+    def reset(self, name: str = None):
+        """
+        Drops a client (or all of them) so the next get() builds a fresh one.
+        """
+        for key in [name] if name else list(self._entries):
+            entry = self._entries[key]
+            with entry.lock:
+                entry.client = None
+                entry.health = None
+
+    def _check(self, name: str, entry: _Entry) -> dict:
+        started = time.perf_counter()
+        try:
+            client = self.get(name)
+            if entry.health_check is not None:
+                entry.health_check(client)
+            status, error = "ok", None
+        except Exception as e:
+            status, error = "error", f"{type(e).__name__}: {e}"
+        return {
+            "status": status,
+            "error": error,
+            "latency_seconds": time.perf_counter() - started,
+            "checked_at": time.time(),
+        }
+
+    def health(self, probe: bool = False) -> dict:
+        """
+        Per-client state. With probe=True each client is built if needed and its
+        health check run (results cached for HEALTH_CHECK_TTL_SECONDS).
+        """
+        report = {}
+        for name, entry in self._entries.items():
+            if probe and (entry.health is None or time.time() - entry.health["checked_at"] > HEALTH_CHECK_TTL_SECONDS):
+                entry.health = self._check(name, entry)
+            report[name] = {
+                "initialized": entry.client is not None,
+                "init_seconds": entry.init_seconds,
+                "init_error": entry.error,
+                "health": entry.health,
+            }
+        return report
+
+    def summary(self) -> dict:
+        """
+        Initialized flag and last health status per client, without error details;
+        safe to serve unauthenticated. Never builds or probes anything.
+        """
+        return {
+            name: {
+                "initialized": entry.client is not None,
+                "status": entry.health["status"] if entry.health else None,
+            }
+            for name, entry in self._entries.items()
+        }
+
+registry = ClientRegistry()
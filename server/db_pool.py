@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+# Connection pool settings for the sync and async engines, from the environment.
+# The defaults suit a direct Postgres/MySQL connection; behind Supabase's pooler
+# (PgBouncer in transaction mode) set DB_PGBOUNCER=true.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections older than this are replaced on checkout, before the server or pooler drops them
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Test each connection with a cheap round trip on checkout; stale ones are replaced transparently
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# Transaction-mode PgBouncer: no prepared statements survive between transactions
+PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() in ("1", "true", "yes")
+# Leave pooling to an external pooler entirely (a new connection per checkout)
+NULL_POOL = os.getenv("DB_NULL_POOL", "false").lower() in ("1", "true", "yes")
+
+class CheckoutStats:
+    """
+    Time spent obtaining a connection from the pool (queueing for a free
+    connection, opening a new one and the pre-ping), plus timeouts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.waits = deque(maxlen=1000) # Recent checkouts, for percentiles
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.waits.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self.waits)
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_seconds": self.wait_total / self.checkouts if self.checkouts else 0.0,
+                "wait_p95_seconds": recent[min(len(recent) - 1, int(0.95 * len(recent)))] if recent else 0.0,
+                "wait_max_seconds": self.wait_max,
+            }
+
+class _TimedCheckout:
+    # Shared by the sync and async pool classes
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep counting where this one left off
+        pool = super().recreate()
+        pool.checkout_stats = self.checkout_stats
+        return pool
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.checkout_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.checkout_stats.record(time.perf_counter() - started)
+        return connection
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+def _pgbouncer_connect_args(drivername: str) -> dict:
+    if drivername == "postgresql+asyncpg":
+        # asyncpg prepares every statement; unique names and no caches keep them per transaction
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+        }
+    if drivername.startswith("postgresql+psycopg") and drivername != "postgresql+psycopg2":
+        return {"prepare_threshold": None} # psycopg 3
+    return {} # psycopg2 never uses server-side prepared statements
+
+def engine_kwargs(url, async_engine: bool = False) -> dict:
+    """
+    Keyword arguments for create_engine/create_async_engine for `url` (a sqlalchemy URL).
+    """
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {} # In-memory SQLite keeps its single-connection pool
+
+    kwargs = {"pool_pre_ping": POOL_PRE_PING}
+    if NULL_POOL:
+        kwargs["poolclass"] = NullPool
+    else:
+        kwargs["poolclass"] = TimedAsyncQueuePool if async_engine else TimedQueuePool
+        kwargs.update(
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_timeout=POOL_TIMEOUT,
+            pool_recycle=POOL_RECYCLE,
+        )
+    if PGBOUNCER:
+        kwargs["connect_args"] = _pgbouncer_connect_args(url.drivername)
+    return kwargs
+
+def pool_stats(engine) -> dict:
+    """
+    Current occupancy and checkout timings for an engine's pool (sync or async engine).
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+
+    checked_out = pool.checkedout()
+    capacity = pool.size() + max(MAX_OVERFLOW, 0)
+    stats = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": MAX_OVERFLOW,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "utilization": checked_out / capacity if capacity else 0.0,
+    }
+    if isinstance(pool, _TimedCheckout):
+        stats.update(pool.checkout_stats.snapshot())
+    return stats
@@ -0,0 +1,63 @@
+import database
+import sqlalchemy as sa
+
+# Before test_results.resume_id became unique (migration 0002), a double submit
+# could store two results for one resume. This keeps each resume's latest
+# result and drops the rest, so the migration can create the unique index.
+#
+# It runs before any migration has (PostgreSQL rolls 0001 back together with a
+# failed 0002), so it only touches columns the pre-migration schema already had.
+# Applicant summaries are rebuilt by migration 0004.
+
+test_results = sa.table(
+    "test_results",
+    sa.column("id", sa.Integer()),
+    sa.column("resume_id", sa.Integer()),
+    sa.column("created_at", sa.DateTime()),
+)
+applicant_summaries = sa.table(
+    "applicant_summaries",
+    sa.column("test_result_id", sa.Integer()),
+)
+
+def duplicate_ids(conn) -> list:
+    duplicated = (
+        sa.select(test_results.c.resume_id)
+        .group_by(test_results.c.resume_id)
+        .having(sa.func.count(test_results.c.id) > 1)
+    )
+    rows = conn.execute(
+        sa.select(test_results.c.id, test_results.c.resume_id)
+        .where(test_results.c.resume_id.in_(duplicated))
+        .order_by(test_results.c.resume_id, test_results.c.created_at.desc(), test_results.c.id.desc())
+    ).all()
+
+    # Rows come newest first per resume; everything after the first is a duplicate
+    seen, ids = set(), []
+    for result_id, resume_id in rows:
+        if resume_id in seen:
+            ids.append(result_id)
+        seen.add(resume_id)
+    return ids
+
+def dedupe_test_results():
+    try:
+        with database.engine.begin() as conn:
+            ids = duplicate_ids(conn)
+            if ids and sa.inspect(conn).has_table("applicant_summaries"):
+                # Older databases may have summaries pointing at the rows removed below
+                conn.execute(
+                    applicant_summaries.update()
+                    .where(applicant_summaries.c.test_result_id.in_(ids))
+                    .values(test_result_id=None)
+                )
+            if ids:
+                conn.execute(test_results.delete().where(test_results.c.id.in_(ids)))
+
+        print(f"✅ Removed {len(ids)} duplicate test results.")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+
+if __name__ == "__main__":
+    dedupe_test_results()
@@ -0,0 +1,56 @@
+import argparse
+import database
+import migrate
+from sqlalchemy.orm import Session
+from llm_utils import generate_skill_test_content
+from skills import ALLOWED_SKILLS
+import question_bank
+
+# Newest banked questions per skill listed in each prompt as ones not to repeat
+AVOID_LIMIT = 50
+
+def fill_question_bank(skills: list, target: int, max_rounds: int):
+    migrate.require_current()
+
+    db: Session = database.SessionLocal()
+    try:
+        for skill in skills:
+            removed = question_bank.evict(db, skill)
+            db.commit()
+
+            rounds = 0
+            sizes = question_bank.pool_sizes(db, skill)
+            while min(sizes.values()) < target and rounds < max_rounds:
+                rounds += 1
+                # One LLM call yields 5 MCQ + 5 SYNTAX questions for the skill. The prompt
+                # lists what is already banked, so each round asks for something new.
+                try:
+                    questions = generate_skill_test_content(skill, question_bank.recent_questions(db, skill, AVOID_LIMIT))
+                except Exception as e:
+                    print(f"  {skill}: LLM call failed: {e}")
+                    continue
+                added = question_bank.add_questions(db, questions)
+                db.commit()
+                sizes = question_bank.pool_sizes(db, skill)
+                print(f"  {skill}: +{added} (MCQ={sizes['MCQ']}, SYNTAX={sizes['SYNTAX']})")
+                if not added:
+                    # Only repeats came back (e.g. a coalesced or deterministic response); more rounds won't help
+                    break
+
+            status = "✅" if min(sizes.values()) >= target else "⚠️ "
+            print(f"{status} {skill}: MCQ={sizes['MCQ']}, SYNTAX={sizes['SYNTAX']} (evicted {removed}, {rounds} LLM calls)")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate test questions per skill into the question bank.")
+    parser.add_argument("--skills", nargs="+", default=ALLOWED_SKILLS)
+    parser.add_argument("--target", type=int, default=question_bank.MIN_POOL * 2, help="Live questions wanted per (skill, type).")
+    parser.add_argument("--max-rounds", type=int, default=20, help="LLM calls allowed per skill.")
+    args = parser.parse_args()
+
+    fill_question_bank(args.skills, args.target, args.max_rounds)
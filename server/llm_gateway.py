@@ -0,0 +1,280 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from dotenv import load_dotenv
+from clients import registry
+import metrics
+from singleflight import AsyncSingleFlight
+from llm_providers import PROVIDER, LLMProvider, create_provider
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Every LLM call in the process goes through one gateway running its own event loop,
+# so concurrency and rate limits are shared by sync callers (worker threads, sync
+# routes) and async callers alike.
+# Defaults to the provider's own model (see llm_providers.py)
+DEFAULT_MODEL = os.getenv("LLM_MODEL")
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "250000"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1"))
+BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "30"))
+TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+HEALTH_CHECK_TIMEOUT_SECONDS = 10
+# Identical in-flight calls (same operation, model, prompt and schema) share one request
+COALESCE = os.getenv("LLM_COALESCE", "true").lower() in ("1", "true", "yes")
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+CALL_SECONDS = metrics.Histogram(
+    "llm_call_duration_seconds", "LLM calls by operation, excluding time queued behind the rate limits.",
+    ("provider", "operation", "outcome"), buckets=metrics.SLOW_BUCKETS
+)
+TOKENS = metrics.Counter("llm_tokens", "Tokens reported by the provider.", ("provider", "operation", "kind"))
+RETRIES = metrics.Counter("llm_retries", "Retried LLM call attempts.", ("provider", "operation"))
+
+class LLMError(Exception):
+    pass
+
+class TokenBucket:
+    """
+    Refills `rate_per_minute` units per minute up to `capacity`. acquire() waits
+    until enough units are available; debit() charges usage discovered afterwards
+    and may push the balance negative, delaying later callers.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+    def debit(self, amount: float):
+        self._refill()
+        self.tokens -= amount
+
+class _OperationStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.latency_total = 0.0
+        self.latencies = deque(maxlen=1000) # Recent successful calls, for percentiles
+
+    def snapshot(self) -> dict:
+        recent = sorted(self.latencies)
+
+        def percentile(p):
+            return recent[min(len(recent) - 1, int(p * len(recent)))] if recent else 0.0
+
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "latency_avg_seconds": self.latency_total / self.calls if self.calls else 0.0,
+            "latency_p50_seconds": percentile(0.50),
+            "latency_p95_seconds": percentile(0.95),
+        }
+
+class LLMGateway:
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, requests_per_minute: float = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = TOKENS_PER_MINUTE, max_retries: int = MAX_RETRIES,
+                 provider: LLMProvider = None):
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self._provider = provider # None: the shared "llm" client from the registry, built on first call
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self._singleflight = AsyncSingleFlight() # Only touched from the gateway loop
+
+    @property
+    def provider(self) -> LLMProvider:
+        return self._provider or registry.get("llm")
+
+    # --- event loop plumbing ---
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-gateway", daemon=True).start()
+                # Primitives are created here so they belong to the gateway loop
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._request_bucket = TokenBucket(self.requests_per_minute)
+                self._token_bucket = TokenBucket(self.tokens_per_minute)
+                self._loop = loop
+            return self._loop
+
+    async def generate_json(self, operation: str, prompt: str, response_schema: dict, model: str = None):
+        """
+        Awaitable from any event loop; the call itself runs on the gateway loop.
+        """
+        loop = self._ensure_loop()
+        coro = self._coalesced(operation, prompt, response_schema, model or DEFAULT_MODEL or self.provider.default_model)
+        try:
+            if asyncio.get_running_loop() is loop:
+                return await coro
+        except RuntimeError:
+            pass
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def generate_json_sync(self, operation: str, prompt: str, response_schema: dict, model: str = None):
+        """
+        Blocking variant for threads that are not running an event loop.
+        """
+        loop = self._ensure_loop()
+        coro = self._coalesced(operation, prompt, response_schema, model or DEFAULT_MODEL or self.provider.default_model)
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def run_sync(self, coro):
+        """
+        Runs a coroutine that makes gateway calls on the gateway loop and blocks for its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    # --- the call itself ---
+
+    async def _coalesced(self, operation: str, prompt: str, response_schema: dict, model: str):
+        if not COALESCE:
+            return await self._generate_json(operation, prompt, response_schema, model)
+        digest = hashlib.sha256(
+            json.dumps([prompt, response_schema], sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        result = await self._singleflight.do(
+            (operation, model, digest),
+            lambda: self._generate_json(operation, prompt, response_schema, model)
+        )
+        # Callers post-process the parsed JSON in place, so each gets its own copy
+        return copy.deepcopy(result)
+
+    def _operation_stats(self, operation: str) -> _OperationStats:
+        with self._stats_lock:
+            return self._stats.setdefault(operation, _OperationStats())
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, (asyncio.TimeoutError, ConnectionError, json.JSONDecodeError)):
+            return True
+        status_code = getattr(error, "code", None) or getattr(error, "status_code", None)
+        return status_code in RETRYABLE_STATUS_CODES or self.provider.is_retryable(error)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt)))
+
+    async def _generate_json(self, operation: str, prompt: str, response_schema: dict, model: str):
+        stats = self._operation_stats(operation)
+        # Rough pre-charge (~4 chars per token for the prompt, plus an output allowance);
+        # corrected with the reported usage once the call returns.
+        estimated_tokens = len(prompt) / 4 + 1000
+
+        attempt = 0
+        while True:
+            started = None
+            try:
+                async with self._semaphore:
+                    await self._request_bucket.acquire(1)
+                    await self._token_bucket.acquire(estimated_tokens)
+                    started = time.perf_counter() # Latency excludes time queued behind the limits
+                    self.in_flight += 1
+                    try:
+                        response = await asyncio.wait_for(
+                            self.provider.generate(operation, prompt, response_schema, model),
+                            timeout=TIMEOUT_SECONDS
+                        )
+                    finally:
+                        self.in_flight -= 1
+
+                prompt_tokens = response.prompt_tokens
+                output_tokens = response.output_tokens
+                if prompt_tokens or output_tokens:
+                    self._token_bucket.debit(prompt_tokens + output_tokens - estimated_tokens)
+
+                result = json.loads(response.text)
+
+                latency = time.perf_counter() - started
+                provider = self.provider.name
+                CALL_SECONDS.observe(latency, provider=provider, operation=operation, outcome="ok")
+                TOKENS.inc(prompt_tokens, provider=provider, operation=operation, kind="prompt")
+                TOKENS.inc(output_tokens, provider=provider, operation=operation, kind="output")
+                with self._stats_lock:
+                    stats.calls += 1
+                    stats.prompt_tokens += prompt_tokens
+                    stats.output_tokens += output_tokens
+                    stats.latency_total += latency
+                    stats.latencies.append(latency)
+                return result
+
+            except Exception as e:
+                if attempt < self.max_retries and self._is_retryable(e):
+                    delay = self._backoff(attempt)
+                    attempt += 1
+                    RETRIES.inc(provider=self.provider.name, operation=operation)
+                    with self._stats_lock:
+                        stats.retries += 1
+                    logger.warning(
+                        "LLM %s attempt %d failed (%s); retrying in %.1fs", operation, attempt, e, delay,
+                        extra={"operation": operation, "attempt": attempt}
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+                if started is not None:
+                    CALL_SECONDS.observe(
+                        time.perf_counter() - started, provider=self.provider.name, operation=operation, outcome="error"
+                    )
+                with self._stats_lock:
+                    stats.calls += 1
+                    stats.errors += 1
+                    if started is not None:
+                        stats.latency_total += time.perf_counter() - started
+                raise LLMError(f"{operation} failed: {e}") from e
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            operations = {name: s.snapshot() for name, s in self._stats.items()}
+        return {
+            "provider": self._provider.name if self._provider else PROVIDER,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "coalescing": self._singleflight.stats(),
+            "operations": operations,
+        }
+
+    def health_check(self, provider: LLMProvider):
+        model = DEFAULT_MODEL or provider.default_model
+        self.run_sync(asyncio.wait_for(provider.health_check(model), timeout=HEALTH_CHECK_TIMEOUT_SECONDS))
+
+gateway = LLMGateway()
+registry.register("llm", create_provider, health_check=gateway.health_check)
@@ -0,0 +1,199 @@
+import asyncio
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import os
+import random
+import re
+from skills import ALLOWED_SKILLS
+
+# Backends the LLM gateway can talk to, picked with LLM_PROVIDER. Providers only
+# make the call; rate limits, retries, coalescing and metrics stay in the gateway.
+PROVIDER = os.getenv("LLM_PROVIDER", "gemini").lower()
+
+class ProviderResponse:
+    def __init__(self, text: str, prompt_tokens: int = 0, output_tokens: int = 0):
+        self.text = text # JSON document as returned by the model
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+
+class LLMProvider(ABC):
+    name = None
+    default_model = None
+
+    @abstractmethod
+    async def generate(self, operation: str, prompt: str, response_schema: dict, model: str) -> ProviderResponse:
+        ...
+
+    def is_retryable(self, error: Exception) -> bool:
+        """
+        Provider-specific transient errors, on top of the gateway's generic checks.
+        """
+        return False
+
+    async def health_check(self, model: str):
+        """
+        A cheap authenticated request that raises if the provider is unusable.
+        """
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+    default_model = "gemini-2.5-flash"
+
+    def __init__(self):
+        from google import genai
+        from google.genai import types
+        self._types = types
+        self.client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+
+    async def generate(self, operation, prompt, response_schema, model):
+        response = await self.client.aio.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=self._types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=response_schema
+            )
+        )
+        usage = getattr(response, "usage_metadata", None)
+        return ProviderResponse(
+            response.text,
+            getattr(usage, "prompt_token_count", None) or 0,
+            getattr(usage, "candidates_token_count", None) or 0
+        )
+
+    async def health_check(self, model):
+        await self.client.aio.models.get(model=model)
+
+class GroqProvider(LLMProvider):
+    name = "groq"
+    default_model = "llama-3.3-70b-versatile"
+
+    def __init__(self):
+        import groq
+        self._groq = groq
+        self.client = groq.AsyncGroq(api_key=os.environ.get("GROQ_API_KEY"))
+
+    async def generate(self, operation, prompt, response_schema, model):
+        # JSON mode only returns objects, so array schemas are wrapped in {"items": [...]}
+        wrapped = response_schema.get("type", "").upper() == "ARRAY"
+        schema = {"type": "OBJECT", "properties": {"items": response_schema}} if wrapped else response_schema
+        completion = await self.client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": f"Respond with a single JSON object matching this schema: {json.dumps(schema)}"},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"}
+        )
+        text = completion.choices[0].message.content
+        if wrapped:
+            text = json.dumps(json.loads(text).get("items", []))
+        usage = completion.usage
+        return ProviderResponse(
+            text,
+            getattr(usage, "prompt_tokens", None) or 0,
+            getattr(usage, "completion_tokens", None) or 0
+        )
+
+    def is_retryable(self, error):
+        return isinstance(error, (self._groq.APIConnectionError, self._groq.APITimeoutError))
+
+    async def health_check(self, model):
+        await self.client.models.retrieve(model)
+
+class StubProviderError(Exception):
+    code = 503 # Retryable, like a provider overload
+
+class StubProvider(LLMProvider):
+    """
+    Offline provider for load tests and local runs. Answers are derived from a
+    hash of the prompt, so the same input always gives the same output; latency
+    and failures are injected from LLM_STUB_* settings.
+    """
+    name = "stub"
+    default_model = "stub"
+
+    def __init__(self, latency_ms: float = None, jitter_ms: float = None, failure_rate: float = None, seed: int = None):
+        self.latency_ms = float(os.getenv("LLM_STUB_LATENCY_MS", "200")) if latency_ms is None else latency_ms
+        self.jitter_ms = float(os.getenv("LLM_STUB_JITTER_MS", "50")) if jitter_ms is None else jitter_ms
+        self.failure_rate = float(os.getenv("LLM_STUB_FAILURE_RATE", "0")) if failure_rate is None else failure_rate
+        self.seed = int(os.getenv("LLM_STUB_SEED", "0")) if seed is None else seed
+        self._random = random.Random(self.seed) # Latency and failure draws
+
+    async def generate(self, operation, prompt, response_schema, model):
+        delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+        await asyncio.sleep(delay)
+        if self._random.random() < self.failure_rate:
+            raise StubProviderError(f"Injected failure for {operation}")
+
+        rng = random.Random(f"{self.seed}:{hashlib.sha256(prompt.encode('utf-8')).hexdigest()}")
+        if operation == "parse_resume":
+            result = self._parse_resume(prompt, rng)
+        elif operation == "summarize_resume":
+            result = {"summary": self._parse_resume(prompt, rng)["summary"]}
+        elif operation == "generate_questions":
+            result = self._questions(prompt, rng)
+        else:
+            result = self._from_schema(response_schema, rng)
+        text = json.dumps(result)
+        return ProviderResponse(text, len(prompt) // 4, len(text) // 4)
+
+    @staticmethod
+    def _parse_resume(prompt: str, rng: random.Random) -> dict:
+        # Only look at the resume itself, not the allowed-skills list in the instructions
+        resume_text = prompt.rsplit("RESUME TEXT:", 1)[-1]
+        skills = [
+            s for s in ALLOWED_SKILLS
+            if re.search(r"(?<![\w+#])" + re.escape(s) + r"(?![\w+#])", resume_text, re.IGNORECASE)
+        ]
+        return {
+            "skills": skills or rng.sample(ALLOWED_SKILLS, 3),
+            "experience_years": rng.randint(0, 15),
+            "summary": f"Stub summary of a {len(resume_text.split())}-word resume."
+        }
+
+    @staticmethod
+    def _questions(prompt: str, rng: random.Random) -> list:
+        match = re.search(r"For the skill: (\".*?\")", prompt)
+        skill = json.loads(match.group(1)) if match else "General"
+        questions = []
+        for question_type in ("MCQ", "SYNTAX"):
+            for i in range(5):
+                options = [f"{skill} option {i + 1}.{n}" for n in range(1, 5)]
+                questions.append({
+                    "skill": skill,
+                    "type": question_type,
+                    "question": f"Stub {question_type} question {i + 1} about {skill} ({rng.randrange(10 ** 6)})",
+                    "options": options,
+                    "correct_answer": rng.choice(options)
+                })
+        return questions
+
+    def _from_schema(self, schema: dict, rng: random.Random):
+        kind = schema.get("type", "STRING").upper()
+        if "enum" in schema:
+            return rng.choice(schema["enum"])
+        if kind == "OBJECT":
+            return {key: self._from_schema(sub, rng) for key, sub in schema.get("properties", {}).items()}
+        if kind == "ARRAY":
+            return [self._from_schema(schema.get("items", {}), rng) for _ in range(rng.randint(1, 3))]
+        if kind == "INTEGER":
+            return rng.randint(0, 10)
+        if kind == "NUMBER":
+            return round(rng.uniform(0, 10), 2)
+        if kind == "BOOLEAN":
+            return rng.random() < 0.5
+        return f"stub-{rng.randrange(10 ** 6)}"
+
+PROVIDERS = {
+    GeminiProvider.name: GeminiProvider,
+    GroqProvider.name: GroqProvider,
+    StubProvider.name: StubProvider,
+}
+
+def create_provider(name: str = None) -> LLMProvider:
+    name = (name or PROVIDER).lower()
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider '{name}'. Choose from: {', '.join(PROVIDERS)}")
+    return PROVIDERS[name]()
@@ -1,28 +1,52 @@
 import os
 import json
-from google import genai
-from google.genai import types
-from dotenv import load_dotenv
+import asyncio
+import logging
+from skills import ALLOWED_SKILLS
+from llm_gateway import gateway
+from log_utils import sample_fields
 
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# Initialize Client
-client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+RESUME_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "skills": {
+            "type": "ARRAY",
+            "items": {"type": "STRING"}
+        },
+        "experience_years": {"type": "INTEGER"},
+        "summary": {"type": "STRING"}
+    },
+    "required": ["skills", "experience_years", "summary"]
+}
 
-def parse_resume_content(text: str):
+QUESTIONS_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "skill": {"type": "STRING"},
+            "type": {"type": "STRING", "enum": ["MCQ", "SYNTAX"]},
+            "question": {"type": "STRING"},
+            "options": {
+                "type": "ARRAY",
+                "items": {"type": "STRING"}
+            },
+            "correct_answer": {"type": "STRING"}
+        },
+        "required": ["skill", "type", "question", "options", "correct_answer"]
+    }
+}
+
+def parse_resume_content(text: str, strict: bool = False):
     """
-    Analyzes resume text using Google Gemini (google-genai SDK) to extract structured data.
+    Analyzes resume text with the configured LLM provider to extract structured data.
+    With strict=True LLM failures are raised instead of returned as an empty parse.
     """
     if not text or len(text) < 10:
         return {"skills": [], "experience_years": 0, "summary": ""}
 
-    print("DEBUG RESUME TEXT START")
-    print(text[:1000])
-    print("DEBUG RESUME TEXT END")
-
-    # Defined Allowed Skills
-    allowed_skills = ["Python", "C++", "Java", "Scala", "JavaScript", "C", "C#", "Ruby", "PHP", "Swift", "Kotlin", "Go", "Rust", "TypeScript", "MySQL"]
-
     prompt = f"""
     You are an expert Resume Analyzer.
     
@@ -31,7 +55,7 @@ def parse_resume_content(text: str):
     2. Extract specific data into a JSON object.
     
     STRICT REQUIREMENTS:
-    - Extract 'skills' ONLY if they are in this list: {json.dumps(allowed_skills)}.
+    - Extract 'skills' ONLY if they are in this list: {json.dumps(ALLOWED_SKILLS)}.
     - Calculate 'experience_years' (integer).
     - Write a brief 'summary'.
 
@@ -40,58 +64,79 @@ def parse_resume_content(text: str):
     """
 
     try:
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema={   
-                    "type": "OBJECT",
-                    "properties": {
-                        "skills": {
-                            "type": "ARRAY",
-                            "items": {"type": "STRING"}
-                        },
-                        "experience_years": {"type": "INTEGER"},
-                        "summary": {"type": "STRING"}
-                    },
-                    "required": ["skills", "experience_years", "summary"]
-                }
-            )
-        )
-        
-        response_text = response.text
-        print(f"DEBUG: Raw LLM Response:\n{response_text}")
-        
-        return json.loads(response_text)
+        # Rate limiting, retries and metrics are handled by the gateway
+        parsed = gateway.generate_json_sync("parse_resume", prompt, RESUME_SCHEMA)
+        if logger.isEnabledFor(logging.DEBUG):
+            # The resume and the parse are personal data: only a sample carries them
+            logger.debug("Parsed resume", extra={
+                "text_chars": len(text),
+                "skills_found": len(parsed.get("skills") or []),
+                **sample_fields(text_excerpt=text[:1000], llm_response=parsed),
+            })
+
+        return parsed
 
     except Exception as e:
-        print(f"LLM Error: {e}")
+        logger.warning("Resume parse failed: %s", e, extra={"operation": "parse_resume"})
+        if strict:
+            raise
         return {
             "skills": [], 
             "experience_years": 0, 
-            "summary": f"Error parsing with Gemini: {str(e)}"
+            "summary": f"Error parsing with LLM: {str(e)}"
         }
 
-def generate_combined_test_content(skills: list):
+SUMMARY_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {"summary": {"type": "STRING"}},
+    "required": ["summary"]
+}
+
+def summarize_resume_content(text: str, strict: bool = False) -> str:
     """
-    Generates 5 MCQs and 5 Syntax questions for EACH skill in the list using Gemini.
-    Returns a unified list of questions.
+    Summary-only LLM call for resumes whose skills and experience were extracted
+    locally; sends a shorter excerpt than parse_resume_content.
     """
-    if not skills:
-        return []
+    prompt = f"""
+    You are an expert Resume Analyzer.
+    Write a brief 'summary' (2-3 sentences) of the candidate described below.
+
+    RESUME TEXT:
+    {text[:4000]}
+    """
+
+    try:
+        return gateway.generate_json_sync("summarize_resume", prompt, SUMMARY_SCHEMA).get("summary", "")
+    except Exception as e:
+        logger.warning("Resume summary failed: %s", e, extra={"operation": "summarize_resume"})
+        if strict:
+            raise
+        return ""
+
+# Extra rounds for skills whose request failed; the rest of the test is kept either way
+TEST_GENERATION_RETRIES = int(os.getenv("TEST_GENERATION_RETRIES", "2"))
+
+async def agenerate_skill_test_content(skill: str, avoid: list = None):
+    """
+    Generates 5 MCQs and 5 Syntax questions for a single skill using the LLM.
+    avoid lists existing questions the LLM is told not to repeat.
+    Raises on LLM errors or an empty response.
+    """
+    avoid_section = f"""
+    Do NOT repeat or rephrase any of these existing questions:
+    {json.dumps(avoid)}""" if avoid else ""
 
     prompt = f"""
     You are a Technical Interview Question Generator.
     
     INSTRUCTIONS:
-    For EACH of the following skills: {json.dumps(skills)}
+    For the skill: {json.dumps(skill)}
     Generate exactly:
     - 5 Multiple Choice Questions (MCQ) testing core concepts.
     - 5 Syntax/Snippet Questions testing code understanding (MCQ style).
     
-    TOTAL QUESTIONS = {len(skills) * 10}
-
+    TOTAL QUESTIONS = 10
+{avoid_section}
     OUTPUT SCHEMA (JSON List):
     [
         {{
@@ -105,34 +150,62 @@ def generate_combined_test_content(skills: list):
     ]
     """
 
-    try:
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type="application/json",
-                response_schema={
-                    "type": "ARRAY",
-                    "items": {
-                        "type": "OBJECT",
-                        "properties": {
-                            "skill": {"type": "STRING"},
-                            "type": {"type": "STRING", "enum": ["MCQ", "SYNTAX"]},
-                            "question": {"type": "STRING"},
-                            "options": {
-                                "type": "ARRAY",
-                                "items": {"type": "STRING"}
-                            },
-                            "correct_answer": {"type": "STRING"}
-                        },
-                        "required": ["skill", "type", "question", "options", "correct_answer"]
-                    }
-                }
-            )
-        )
-        
-        return json.loads(response.text)
+    questions = await gateway.generate_json("generate_questions", prompt, QUESTIONS_SCHEMA)
+    if not questions:
+        raise ValueError(f"No questions returned for {skill}")
+    for q in questions:
+        q["skill"] = skill # Keep the resume's spelling so grading/reporting group correctly
+    return questions
 
-    except Exception as e:
-        print(f"Test Generation Error: {e}")
+async def agenerate_combined_test_content(skills: list, on_batch=None):
+    """
+    Generates 5 MCQs and 5 Syntax questions for EACH skill in the list using the LLM,
+    one concurrent request per skill (bounded by the gateway's concurrency limit).
+    Failed skills are retried up to TEST_GENERATION_RETRIES times; skills that
+    still fail are left out. Returns a unified list of questions.
+    on_batch(skill, questions), if given, is called as soon as each skill's batch is ready.
+    """
+    if not skills:
         return []
+
+    async def generate(skill):
+        questions = await agenerate_skill_test_content(skill)
+        if on_batch:
+            on_batch(skill, questions)
+        return questions
+
+    results = {}
+    pending = list(dict.fromkeys(skills))
+    for attempt in range(1 + TEST_GENERATION_RETRIES):
+        outcomes = await asyncio.gather(
+            *(generate(skill) for skill in pending),
+            return_exceptions=True
+        )
+        failed = []
+        for skill, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                logger.warning("Test generation failed for %s: %s", skill, outcome, extra={"skill": skill, "attempt": attempt + 1})
+                failed.append(skill)
+            else:
+                results[skill] = outcome
+        pending = failed
+        if not pending:
+            break
+
+    if pending:
+        logger.error("Test generation gave up on %s", pending, extra={"skills": pending})
+
+    return [q for skill in dict.fromkeys(skills) if skill in results for q in results[skill]]
+
+def generate_skill_test_content(skill: str, avoid: list = None):
+    """
+    Blocking wrapper around agenerate_skill_test_content for sync callers.
+    """
+    return gateway.run_sync(agenerate_skill_test_content(skill, avoid))
+
+def generate_combined_test_content(skills: list, on_batch=None):
+    """
+    Blocking wrapper around agenerate_combined_test_content for sync callers.
+    on_batch runs on the gateway's event loop thread.
+    """
+    return gateway.run_sync(agenerate_combined_test_content(skills, on_batch))
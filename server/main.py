@@ -1,21 +1,40 @@
-from fastapi import FastAPI
+import log_utils
+log_utils.configure_logging() # Before the other imports, so their import-time logs are structured too
+
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+
+from clients import registry
+import auth
+import database
+import metrics
+import profiling
+import resume_cache
+import resume_pipeline
+from llm_gateway import gateway
+from password_hashing import hasher
+from routes import auth_routes, resume_routes, test_routes, recruiter_routes, admin_routes
 
-from database import engine
-import models
-from routes import auth_routes, resume_routes, test_routes, recruiter_routes
+logger = logging.getLogger(__name__)
 
-# Create database tables
-try:
-    models.Base.metadata.create_all(bind=engine)
-    print("✅ Database tables verified/created.")
-except Exception as e:
-    print(f"❌ DATABASE STARTUP ERROR: {e}")
+# The schema is managed by migrations (python migrate.py upgrade), run once per
+# deploy rather than by every worker on startup.
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The resume pipeline's queue is in memory, so pick up the jobs a previous
+    # process had queued or was running when it stopped
+    resume_pipeline.start_recovery()
+    yield
 
 app = FastAPI(
     title="Resume Lie Detector API",
     description="Backend for AI-Powered Resume Verification",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 import os
@@ -28,17 +47,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Request-ID"], # Pagination cursor for /recruiter/applicants; log correlation
 )
+app.add_middleware(profiling.ProfilingMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(log_utils.RequestIdMiddleware)
 
-# Debug: Print startup info to Render logs
-print("🚀 Server starting with UNIVERSAL CORS (*)")
-print(f"DATABASE_URL set: {'Yes' if os.getenv('DATABASE_URL') else 'No'}")
-print(f"FRONTEND_URL set: {os.getenv('FRONTEND_URL')}")
+# Startup info for the Render logs
+logger.info("Server starting with UNIVERSAL CORS (*)", extra={
+    "database_url_set": bool(os.getenv("DATABASE_URL")),
+    "frontend_url": os.getenv("FRONTEND_URL"),
+})
 
 app.include_router(auth_routes.router)
 app.include_router(resume_routes.router)
 app.include_router(test_routes.router)
 app.include_router(recruiter_routes.router)
+app.include_router(admin_routes.router)
 
 @app.get("/")
 def read_root():
@@ -47,3 +72,27 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+@app.get("/health/clients")
+def client_health():
+    # External clients are created lazily; probing them and error details are at /admin/clients
+    return registry.summary()
+
+# Component stats, exported as gauges on every scrape
+metrics.register_stats("db_pool", database.pool_stats, label="engine")
+metrics.register_stats("resume_cache", resume_cache.stats, label="layer")
+metrics.register_stats("llm_gateway", lambda: {k: v for k, v in gateway.stats().items() if k != "operations"})
+metrics.register_stats("test_generation", test_routes.generation_flight.stats)
+metrics.register_stats("password_hash", hasher.stats)
+metrics.register_stats("auth_user_cache", auth.user_cache.stats)
+metrics.register_stats("logging", log_utils.stats)
+metrics.register_stats("slow_request_profiles", profiling.stats)
+
+# Optional shared secret for scrapers; without it /metrics is open like /health
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics(authorization: str = Header(default=None)):
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,217 @@
+import logging
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# In-process metrics in the Prometheus text format, served at /metrics. Each
+# worker process keeps its own numbers; scrape every worker (or run one per pod).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SLOW_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120) # LLM calls and pipeline stages
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+logger = logging.getLogger(__name__)
+
+_metrics = []
+_stats_sources = []
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {} # Label values tuple -> series state
+        _metrics.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = list(self._series.items())
+        for key, state in sorted(series):
+            lines.extend(self._render_series(dict(zip(self.labelnames, key)), state))
+        return lines
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def _render_series(self, labels, value):
+        return [f"{self.name}_total{_format_labels(labels)} {_format_value(value)}"]
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._series.get(key)
+            if state is None:
+                state = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observes the block's duration; with an "outcome" label it is set to ok or error.
+        """
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except BaseException:
+            outcome = "error"
+            raise
+        finally:
+            if "outcome" in self.labelnames:
+                labels["outcome"] = outcome
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _render_series(self, labels, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, state["counts"]):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(state['sum'])}")
+        lines.append(f"{self.name}_count{_format_labels(labels)} {state['count']}")
+        return lines
+
+def register_stats(prefix: str, fn, label: str = None):
+    """
+    Exposes a stats() dict as gauges at scrape time: each numeric leaf becomes
+    `<prefix>_<path>`. With `label`, the top-level keys become that label's
+    values instead (e.g. {"sync": {...}} -> db_pool_size{engine="sync"}).
+    """
+    _stats_sources.append((prefix, fn, label))
+
+def _sanitize(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+def _flatten(prefix: str, value, labels: dict, out: dict):
+    if isinstance(value, dict):
+        for key, sub in value.items():
+            _flatten(f"{prefix}_{_sanitize(str(key))}", sub, labels, out)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        out.setdefault(prefix, []).append((labels, value))
+
+def _render_stats() -> list:
+    gauges = {}
+    for prefix, fn, label in _stats_sources:
+        try:
+            stats = fn()
+        except Exception as e:
+            logger.warning("Stats for %s failed: %s", prefix, e)
+            continue
+        if label:
+            for key, sub in stats.items():
+                _flatten(prefix, sub, {label: key}, gauges)
+        else:
+            _flatten(prefix, stats, {}, gauges)
+
+    lines = []
+    for name, samples in gauges.items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+    return lines
+
+def render() -> str:
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    lines.extend(_render_stats())
+    return "\n".join(lines) + "\n"
+
+# --- HTTP requests ---
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to serve a request, including streaming the body.",
+    ("method", "route", "status")
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "SQL statements executed while serving a request.",
+    ("method", "route"), buckets=COUNT_BUCKETS
+)
+
+# Mutable per-request counter; threadpool calls run in a copy of the request's
+# context, so they see (and increment) the same list
+_request_queries = ContextVar("request_queries", default=None)
+
+def count_db_queries(engine):
+    """
+    Counts statements run on a (sync) engine towards the current request.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count(*_):
+        queries = _request_queries.get()
+        if queries is not None:
+            queries[0] += 1
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by route template (not raw path,
+    which would create a series per id).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        queries = [0]
+        token = _request_queries.set(queries)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_queries.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - started, method=scope["method"], route=route, status=status)
+            REQUEST_DB_QUERIES.observe(queries[0], method=scope["method"], route=route)
@@ -0,0 +1,76 @@
+import argparse
+import os
+from alembic import command
+from alembic.config import Config
+
+# Schema migrations (Alembic, see migrations/). Run from the server directory:
+#     python migrate.py upgrade                  # bring the database up to date
+#     python migrate.py upgrade --sql            # print the DDL instead of running it
+#     python migrate.py current / history
+#     python migrate.py revision -m "add x" --autogenerate
+# A database created by create_all() before migrations existed can be upgraded
+# as-is: the baseline revision only creates what is missing.
+
+def get_config() -> Config:
+    return Config(os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini"))
+
+def upgrade(revision: str = "head", sql: bool = False):
+    command.upgrade(get_config(), revision, sql=sql)
+
+def require_current():
+    """
+    Raises unless the database is at the latest revision. For scripts that use
+    the models directly: the schema is only ever changed by `upgrade`.
+    """
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+    import database
+
+    heads = set(ScriptDirectory.from_config(get_config()).get_heads())
+    with database.engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    if current != heads:
+        raise RuntimeError(
+            f"Database is at revision {', '.join(sorted(current)) or 'none'}, not {', '.join(sorted(heads))}. "
+            "Run `python migrate.py upgrade` first."
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database schema migrations.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("upgrade", help="apply migrations up to a revision (default: head)")
+    p.add_argument("revision", nargs="?", default="head")
+    p.add_argument("--sql", action="store_true", help="print the SQL instead of running it")
+
+    p = commands.add_parser("downgrade", help="revert migrations down to a revision")
+    p.add_argument("revision")
+    p.add_argument("--sql", action="store_true", help="print the SQL instead of running it")
+
+    p = commands.add_parser("stamp", help="record a revision as applied without running it")
+    p.add_argument("revision")
+
+    p = commands.add_parser("revision", help="create a new migration file")
+    p.add_argument("-m", "--message", required=True)
+    p.add_argument("--autogenerate", action="store_true", help="diff models.py against the database")
+
+    commands.add_parser("current", help="show the database's revision")
+    commands.add_parser("history", help="list all revisions")
+    commands.add_parser("check", help="fail if models.py has changes no migration covers")
+
+    args = parser.parse_args()
+    config = get_config()
+    if args.command == "upgrade":
+        upgrade(args.revision, sql=args.sql)
+    elif args.command == "downgrade":
+        command.downgrade(config, args.revision, sql=args.sql)
+    elif args.command == "stamp":
+        command.stamp(config, args.revision)
+    elif args.command == "revision":
+        command.revision(config, message=args.message, autogenerate=args.autogenerate)
+    elif args.command == "current":
+        command.current(config, verbose=True)
+    elif args.command == "history":
+        command.history(config)
+    elif args.command == "check":
+        command.check(config)
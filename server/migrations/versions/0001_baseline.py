@@ -0,0 +1,162 @@
+"""Baseline schema
+
+The tables as create_all() used to make them at startup, plus the columns and
+indexes the earlier backfill scripts added by hand. Databases created before
+migrations existed already have some or all of this, so every step checks
+first and only creates what is missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# With --sql there is no database to inspect; the script is written for an empty one
+def _has_table(name):
+    return not context.is_offline_mode() and sa.inspect(op.get_bind()).has_table(name)
+
+def _has_column(table, column):
+    return not context.is_offline_mode() and column in {c["name"] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+def _has_index(table, name):
+    return not context.is_offline_mode() and name in {i["name"] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+def _create_table(name, *columns):
+    if not _has_table(name):
+        op.create_table(name, *columns)
+
+def _create_index(name, table, columns, unique=False):
+    if not _has_index(table, name):
+        op.create_index(name, table, columns, unique=unique)
+
+def upgrade():
+    _create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String(50)),
+        sa.Column("email", sa.String(100)),
+        sa.Column("password_hash", sa.String(255)),
+        sa.Column("role", sa.String(20)),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    _create_index("ix_users_id", "users", ["id"])
+    _create_index("ix_users_username", "users", ["username"], unique=True)
+    _create_index("ix_users_email", "users", ["email"], unique=True)
+
+    _create_table(
+        "resumes",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("file_url", sa.String(255)),
+        sa.Column("parsed_content", sa.JSON()),
+        sa.Column("experience_years", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    if not _has_column("resumes", "experience_years"):
+        op.add_column("resumes", sa.Column("experience_years", sa.Integer()))
+    _create_index("ix_resumes_id", "resumes", ["id"])
+    _create_index("ix_resumes_experience_years", "resumes", ["experience_years"])
+
+    _create_table(
+        "resume_skills",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id")),
+        sa.Column("skill", sa.String(50)),
+        sa.Column("name", sa.String(50)),
+    )
+    _create_index("ix_resume_skills_id", "resume_skills", ["id"])
+    _create_index("ix_resume_skills_resume_id", "resume_skills", ["resume_id"])
+    _create_index("ix_resume_skills_skill_resume_id", "resume_skills", ["skill", "resume_id"])
+
+    _create_table(
+        "test_results",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id")),
+        sa.Column("score", sa.Float()),
+        sa.Column("trust_score", sa.Float()),
+        sa.Column("details", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    _create_index("ix_test_results_id", "test_results", ["id"])
+
+    _create_table(
+        "question_bank",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("skill", sa.String(50)),
+        sa.Column("skill_name", sa.String(50)),
+        sa.Column("question_type", sa.String(20)),
+        sa.Column("question", sa.Text()),
+        sa.Column("question_hash", sa.String(64)),
+        sa.Column("options", sa.JSON()),
+        sa.Column("correct_answer", sa.Text()),
+        sa.Column("times_served", sa.Integer()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    _create_index("ix_question_bank_id", "question_bank", ["id"])
+    _create_index("ix_question_bank_skill_type", "question_bank", ["skill", "question_type", "id"])
+    _create_index("ix_question_bank_skill_hash", "question_bank", ["skill", "question_hash"], unique=True)
+
+    _create_table(
+        "generated_tests",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id")),
+        sa.Column("questions", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    _create_index("ix_generated_tests_id", "generated_tests", ["id"])
+
+    _create_table(
+        "applicant_summaries",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id")),
+        sa.Column("test_result_id", sa.Integer(), sa.ForeignKey("test_results.id")),
+        sa.Column("experience_years", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("trust_score", sa.Float()),
+        sa.Column("last_upload_at", sa.DateTime(), nullable=False),
+        sa.Column("test_taken_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    _create_index("ix_applicant_summaries_last_upload_at", "applicant_summaries", ["last_upload_at", "user_id"])
+    _create_index("ix_applicant_summaries_score", "applicant_summaries", ["score", "user_id"])
+    _create_index("ix_applicant_summaries_experience_years", "applicant_summaries", ["experience_years", "user_id"])
+
+    _create_table(
+        "resume_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("status", sa.String(20)),
+        sa.Column("stage", sa.String(20)),
+        sa.Column("error", sa.Text()),
+        sa.Column("attempts", sa.Integer()),
+        sa.Column("filename", sa.String(255)),
+        sa.Column("content_type", sa.String(100)),
+        sa.Column("file_content", sa.LargeBinary()),
+        sa.Column("content_sha256", sa.String(64)),
+        sa.Column("text_sha256", sa.String(64)),
+        sa.Column("text_content", sa.Text()),
+        sa.Column("file_url", sa.String(255)),
+        sa.Column("parsed_content", sa.JSON()),
+        sa.Column("resume_id", sa.Integer(), sa.ForeignKey("resumes.id")),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    _create_index("ix_resume_jobs_id", "resume_jobs", ["id"])
+    _create_index("ix_resume_jobs_user_id", "resume_jobs", ["user_id"])
+    _create_index("ix_resume_jobs_content_sha256", "resume_jobs", ["content_sha256"])
+    _create_index("ix_resume_jobs_text_sha256", "resume_jobs", ["text_sha256"])
+
+def downgrade():
+    for table in (
+        "resume_jobs", "applicant_summaries", "generated_tests", "question_bank",
+        "test_results", "resume_skills", "resumes", "users",
+    ):
+        op.drop_table(table)
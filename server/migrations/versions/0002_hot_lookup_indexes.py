@@ -0,0 +1,48 @@
+"""Indexes for the hot lookup columns
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# With --sql there is no database to inspect; the script is written for an empty one
+def _has_index(table, name):
+    return not context.is_offline_mode() and name in {i["name"] for i in sa.inspect(op.get_bind()).get_indexes(table)}
+
+def _create_index(name, table, columns, unique=False):
+    if not _has_index(table, name):
+        op.create_index(name, table, columns, unique=unique)
+
+def upgrade():
+    duplicates = 0 if context.is_offline_mode() else op.get_bind().execute(sa.text(
+        "SELECT COUNT(*) FROM (SELECT resume_id FROM test_results"
+        " GROUP BY resume_id HAVING COUNT(*) > 1) AS dupes"
+    )).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} resumes have more than one test result, which blocks the unique index on "
+            "test_results.resume_id. Run `python dedupe_test_results.py` first."
+        )
+
+    _create_index("ix_users_role", "users", ["role"])
+    _create_index("ix_resumes_user_id_created_at", "resumes", ["user_id", "created_at"])
+    _create_index("ix_test_results_resume_id", "test_results", ["resume_id"], unique=True)
+    _create_index("ix_test_results_user_id_created_at", "test_results", ["user_id", "created_at"])
+    _create_index(
+        "ix_generated_tests_user_id_resume_id_created_at", "generated_tests",
+        ["user_id", "resume_id", "created_at"]
+    )
+
+def downgrade():
+    op.drop_index("ix_generated_tests_user_id_resume_id_created_at", table_name="generated_tests")
+    op.drop_index("ix_test_results_user_id_created_at", table_name="test_results")
+    op.drop_index("ix_test_results_resume_id", table_name="test_results")
+    op.drop_index("ix_resumes_user_id_created_at", table_name="resumes")
+    op.drop_index("ix_users_role", table_name="users")
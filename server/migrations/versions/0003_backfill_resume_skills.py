@@ -0,0 +1,83 @@
+"""Backfill resume skills and experience
+
+Resumes saved before skills and experience were stored in their own columns
+only have them inside parsed_content, so the recruiter skill filter and the
+experience sort don't see them. Copies them out for every resume that has no
+resume_skills rows yet, as resume_service.apply_parsed_fields does on save.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from skills import normalize_skill
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+# The tables as of this revision, so later model changes can't alter what it does
+resumes = sa.table(
+    "resumes",
+    sa.column("id", sa.Integer()),
+    sa.column("parsed_content", sa.JSON()),
+    sa.column("experience_years", sa.Integer()),
+)
+resume_skills = sa.table(
+    "resume_skills",
+    sa.column("resume_id", sa.Integer()),
+    sa.column("skill", sa.String(50)),
+    sa.column("name", sa.String(50)),
+)
+
+def _experience_years(parsed: dict) -> int:
+    try:
+        return int(parsed.get("experience_years") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+def _skill_rows(resume_id: int, parsed: dict) -> list:
+    rows, seen = [], set()
+    for name in parsed.get("skills") or []:
+        key = normalize_skill(name)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        rows.append({"resume_id": resume_id, "skill": key[:50], "name": str(name).strip()[:50]})
+    return rows
+
+def upgrade():
+    if context.is_offline_mode():
+        return # Data only; nothing to copy in a database the --sql script creates
+
+    bind = op.get_bind()
+    without_skills = ~sa.exists().where(resume_skills.c.resume_id == resumes.c.id)
+    last_id = 0
+    while True:
+        batch = bind.execute(
+            sa.select(resumes.c.id, resumes.c.parsed_content)
+            .where(resumes.c.id > last_id, without_skills)
+            .order_by(resumes.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not batch:
+            break
+
+        skill_rows = []
+        for resume_id, parsed in batch:
+            parsed = parsed if isinstance(parsed, dict) else {}
+            bind.execute(
+                resumes.update().where(resumes.c.id == resume_id)
+                .values(experience_years=_experience_years(parsed))
+            )
+            skill_rows.extend(_skill_rows(resume_id, parsed))
+        if skill_rows:
+            bind.execute(resume_skills.insert(), skill_rows)
+        last_id = batch[-1][0]
+
+def downgrade():
+    pass # The copied values are still in parsed_content; nothing to undo
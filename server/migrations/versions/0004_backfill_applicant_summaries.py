@@ -0,0 +1,117 @@
+"""Backfill applicant summaries
+
+The recruiter dashboard reads applicant_summaries, which only write paths fill
+in; applicants from before the table existed have no row and would not be
+listed. Rebuilds every applicant's summary from their latest resume and its
+test result, as applicant_summary.rebuild_summaries does.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+import datetime
+from alembic import context, op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+
+# The tables as of this revision, so later model changes can't alter what it does
+users = sa.table(
+    "users",
+    sa.column("id", sa.Integer()),
+    sa.column("role", sa.String(20)),
+    sa.column("created_at", sa.DateTime()),
+)
+resumes = sa.table(
+    "resumes",
+    sa.column("id", sa.Integer()),
+    sa.column("user_id", sa.Integer()),
+    sa.column("experience_years", sa.Integer()),
+    sa.column("created_at", sa.DateTime()),
+)
+test_results = sa.table(
+    "test_results",
+    sa.column("id", sa.Integer()),
+    sa.column("resume_id", sa.Integer()),
+    sa.column("score", sa.Float()),
+    sa.column("trust_score", sa.Float()),
+    sa.column("created_at", sa.DateTime()),
+)
+applicant_summaries = sa.table(
+    "applicant_summaries",
+    sa.column("user_id", sa.Integer()),
+    sa.column("resume_id", sa.Integer()),
+    sa.column("test_result_id", sa.Integer()),
+    sa.column("experience_years", sa.Integer()),
+    sa.column("score", sa.Float()),
+    sa.column("trust_score", sa.Float()),
+    sa.column("last_upload_at", sa.DateTime()),
+    sa.column("test_taken_at", sa.DateTime()),
+    sa.column("updated_at", sa.DateTime()),
+)
+
+def _latest(rows, key):
+    # rows come newest first; keep the first per key
+    latest = {}
+    for row in rows:
+        latest.setdefault(row[key], row)
+    return latest
+
+def upgrade():
+    if context.is_offline_mode():
+        return # Data only; nothing to summarize in a database the --sql script creates
+
+    bind = op.get_bind()
+    now = datetime.datetime.utcnow()
+    last_id = 0
+    while True:
+        applicants = bind.execute(
+            sa.select(users.c.id, users.c.created_at)
+            .where(users.c.role == "applicant", users.c.id > last_id)
+            .order_by(users.c.id)
+            .limit(BATCH_SIZE)
+        ).mappings().all()
+        if not applicants:
+            break
+        user_ids = [a["id"] for a in applicants]
+
+        latest_resumes = _latest(bind.execute(
+            sa.select(resumes)
+            .where(resumes.c.user_id.in_(user_ids))
+            .order_by(resumes.c.user_id, resumes.c.created_at.desc(), resumes.c.id.desc())
+        ).mappings().all(), "user_id")
+        resume_ids = [r["id"] for r in latest_resumes.values()]
+        latest_results = _latest(bind.execute(
+            sa.select(test_results)
+            .where(test_results.c.resume_id.in_(resume_ids))
+            .order_by(test_results.c.resume_id, test_results.c.created_at.desc(), test_results.c.id.desc())
+        ).mappings().all(), "resume_id") if resume_ids else {}
+
+        summaries = []
+        for applicant in applicants:
+            resume = latest_resumes.get(applicant["id"])
+            result = latest_results.get(resume["id"]) if resume else None
+            summaries.append({
+                "user_id": applicant["id"],
+                "resume_id": resume["id"] if resume else None,
+                "experience_years": (resume["experience_years"] or 0) if resume else 0,
+                "last_upload_at": (resume["created_at"] if resume else applicant["created_at"]) or now,
+                "test_result_id": result["id"] if result else None,
+                "score": (result["score"] or 0) if result else 0,
+                "trust_score": result["trust_score"] if result else None,
+                "test_taken_at": result["created_at"] if result else None,
+                "updated_at": now,
+            })
+
+        # Replace rather than upsert: portable across PostgreSQL, MySQL and SQLite
+        bind.execute(applicant_summaries.delete().where(applicant_summaries.c.user_id.in_(user_ids)))
+        bind.execute(applicant_summaries.insert(), summaries)
+        last_id = user_ids[-1]
+
+def downgrade():
+    pass # Summaries are derived data; the write paths keep them from here on
@@ -0,0 +1,24 @@
+"""Mark generated tests complete
+
+Streamed tests are saved before their LLM questions exist; this flag keeps
+them from being reused until generation has finished. Existing rows are
+complete.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("generated_tests", sa.Column("complete", sa.Boolean(), server_default=sa.true(), nullable=False))
+
+def downgrade():
+    with op.batch_alter_table("generated_tests") as batch_op:
+        batch_op.drop_column("complete")
@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Float
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, JSON, Float, Index, LargeBinary, true
 from sqlalchemy.orm import relationship
 from database import Base
 import datetime
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_role", "role"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(50), unique=True, index=True)
@@ -15,21 +18,46 @@ class User(Base):
 
     resumes = relationship("Resume", back_populates="owner")
     test_results = relationship("TestResult", back_populates="user")
+    summary = relationship("ApplicantSummary", back_populates="user", uselist=False)
 
 class Resume(Base):
     __tablename__ = "resumes"
+    __table_args__ = (
+        # An applicant's resumes by upload time, read backwards for newest first
+        Index("ix_resumes_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     file_url = Column(String(255)) # Cloudinary URL
     parsed_content = Column(JSON) # Stores extracted skills, experience, etc.
+    experience_years = Column(Integer, index=True) # Copied out of parsed_content for sorting
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     owner = relationship("User", back_populates="resumes")
     test_results = relationship("TestResult", back_populates="resume")
+    skills = relationship("ResumeSkill", back_populates="resume", cascade="all, delete-orphan")
+
+class ResumeSkill(Base):
+    __tablename__ = "resume_skills"
+    __table_args__ = (
+        Index("ix_resume_skills_skill_resume_id", "skill", "resume_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id"), index=True)
+    skill = Column(String(50)) # Normalized key, see skills.normalize_skill
+    name = Column(String(50)) # As extracted from the resume
+
+    resume = relationship("Resume", back_populates="skills")
 
 class TestResult(Base):
     __tablename__ = "test_results"
+    __table_args__ = (
+        # One test per resume; also serves the "already taken" check
+        Index("ix_test_results_resume_id", "resume_id", unique=True),
+        Index("ix_test_results_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -42,11 +70,79 @@ class TestResult(Base):
     user = relationship("User", back_populates="test_results")
     resume = relationship("Resume", back_populates="test_results")
 
+class BankQuestion(Base):
+    __tablename__ = "question_bank"
+    __table_args__ = (
+        Index("ix_question_bank_skill_type", "skill", "question_type", "id"),
+        Index("ix_question_bank_skill_hash", "skill", "question_hash", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    skill = Column(String(50)) # Normalized key, see skills.normalize_skill
+    skill_name = Column(String(50))
+    question_type = Column(String(20)) # "MCQ" or "SYNTAX"
+    question = Column(Text)
+    question_hash = Column(String(64)) # Dedupes identical questions per skill
+    options = Column(JSON)
+    correct_answer = Column(Text)
+    times_served = Column(Integer, default=0) # Retired after QUESTION_BANK_MAX_SERVES tests
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
 class GeneratedTest(Base):
     __tablename__ = "generated_tests"
+    __table_args__ = (
+        # Reuse lookup for a recent unsubmitted test (see test_routes._create_test)
+        Index("ix_generated_tests_user_id_resume_id_created_at", "user_id", "resume_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     resume_id = Column(Integer, ForeignKey("resumes.id"))
     questions = Column(JSON) # List of all questions with correct answers
+    # False while a streamed test is still being generated; only complete tests are reused
+    complete = Column(Boolean, default=True, server_default=true(), nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+# One row per applicant pointing at their latest resume and its test result.
+# Maintained on write (see applicant_summary.py) so hot reads are a primary-key lookup.
+class ApplicantSummary(Base):
+    __tablename__ = "applicant_summaries"
+    __table_args__ = (
+        # Keyset pagination orders for /recruiter/applicants (user_id breaks ties)
+        Index("ix_applicant_summaries_last_upload_at", "last_upload_at", "user_id"),
+        Index("ix_applicant_summaries_score", "score", "user_id"),
+        Index("ix_applicant_summaries_experience_years", "experience_years", "user_id"),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id"))
+    test_result_id = Column(Integer, ForeignKey("test_results.id"))
+    experience_years = Column(Integer, default=0, nullable=False)
+    score = Column(Float, default=0, nullable=False) # 0 until the latest resume has been tested
+    trust_score = Column(Float)
+    last_upload_at = Column(DateTime, nullable=False) # Latest resume upload, or signup time if none
+    test_taken_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    user = relationship("User", back_populates="summary")
+
+class ResumeJob(Base):
+    __tablename__ = "resume_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    status = Column(String(20), default="queued") # queued, running, failed, completed
+    stage = Column(String(20), default="extract") # Stage to run next: extract, store, parse, save, done
+    error = Column(Text)
+    attempts = Column(Integer, default=0)
+    filename = Column(String(255)) # Storage object name, fixed at upload so retries overwrite
+    content_type = Column(String(100))
+    file_content = Column(LargeBinary) # Raw upload, dropped once the job completes
+    content_sha256 = Column(String(64), index=True) # Hash of the raw upload (resume_cache key)
+    text_sha256 = Column(String(64), index=True) # Hash of successfully extracted text (resume_cache key)
+    text_content = Column(Text) # Output of the extract stage
+    file_url = Column(String(255)) # Output of the store stage
+    parsed_content = Column(JSON) # Output of the parse stage
+    resume_id = Column(Integer, ForeignKey("resumes.id")) # Output of the save stage
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
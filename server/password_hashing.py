@@ -0,0 +1,117 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from passlib.context import CryptContext
+
+# Argon2 is slow on purpose, so hashing runs on its own small pool instead of the
+# shared threadpool: a login burst queues here while other requests keep their
+# threads. Past MAX_QUEUE waiting jobs new ones are refused at once (HTTP 503).
+WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "32"))
+
+# Argon2 cost parameters (passlib defaults). Stored hashes made with other values
+# are upgraded the next time their owner logs in.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536")) # KiB per hash
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
+
+class HasherBusy(Exception):
+    pass
+
+class PasswordHasher:
+    """
+    Runs hash/verify jobs on a bounded thread pool (argon2 releases the GIL) and
+    keeps queue depth, wait and run-time numbers for /metrics.
+    """
+
+    def __init__(self, workers: int = WORKERS, max_queue: int = MAX_QUEUE, context: CryptContext = pwd_context):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.context = context
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.pending = 0 # Queued plus running
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.waits = deque(maxlen=1000) # Recent time spent queued, for percentiles
+        self.durations = deque(maxlen=1000) # Recent time spent hashing
+
+    def _release(self, _future):
+        with self._lock:
+            self.pending -= 1
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise HasherBusy(f"{self.pending} password hashing jobs pending")
+            self.pending += 1
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            with self._lock:
+                self.running += 1
+                self.waits.append(started - submitted)
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.durations.append(time.perf_counter() - started)
+
+        future = self._executor.submit(job)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, password_hash: str):
+        """
+        Returns (valid, new_hash); new_hash is set when the stored hash used
+        other cost parameters and should be replaced.
+        """
+        valid, new_hash = await self._run(self.context.verify_and_update, password, password_hash)
+        if new_hash:
+            with self._lock:
+                self.rehashed += 1
+        return valid, new_hash
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self.waits)
+            durations = sorted(self.durations)
+            pending, running = self.pending, self.running
+            counters = {"completed": self.completed, "rejected": self.rejected, "rehashed": self.rehashed}
+
+        def percentile(values, p):
+            return values[min(len(values) - 1, int(p * len(values)))] if values else 0.0
+
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": running,
+            "queue_depth": pending - running,
+            **counters,
+            "wait_p50_seconds": percentile(waits, 0.50),
+            "wait_p95_seconds": percentile(waits, 0.95),
+            "duration_p50_seconds": percentile(durations, 0.50),
+            "duration_p95_seconds": percentile(durations, 0.95),
+        }
+
+hasher = PasswordHasher()
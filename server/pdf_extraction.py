@@ -0,0 +1,132 @@
+import io
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from pypdf import PdfReader
+
+# parse_resume_content only ever sends the first 8000 characters to the LLM,
+# so there is no point extracting past that.
+MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", "8000"))
+MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30"))
+TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACT_TIMEOUT_SECONDS", "15"))
+PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "4"))
+WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+class PDFExtractionError(Exception):
+    pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that already runs threads (uvicorn, the job pool) is unsafe
+            _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    # A task overran its deadline (or a worker died): replace the pool and kill its
+    # workers. shutdown() alone never stops a running task, and one extract_text()
+    # call on a hostile page can run for minutes, so each timeout would otherwise
+    # leave busy processes behind.
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    if hasattr(pool, "kill_workers"): # Python 3.14+
+        pool.kill_workers()
+        return
+    processes = list((pool._processes or {}).values()) # No public API before 3.14
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.kill()
+
+def _extract_pages(content: bytes, start: int, stop: int, char_budget: int, deadline: float):
+    """
+    Runs in a worker process. Returns (text of pages [start, stop), total page count),
+    stopping early once char_budget is reached or the deadline passes.
+    """
+    reader = PdfReader(io.BytesIO(content))
+    page_count = len(reader.pages)
+    parts = []
+    extracted = 0
+    for index in range(start, min(stop, page_count)):
+        if time.time() > deadline:
+            break
+        text = reader.pages[index].extract_text() or ""
+        parts.append(text)
+        extracted += len(text)
+        if extracted >= char_budget:
+            break
+    return "".join(parts), page_count
+
+def extract_pdf_text(content: bytes) -> str:
+    """
+    Extracts up to MAX_CHARS of text from the first MAX_PAGES pages in a process
+    pool, fanning long documents out in PAGES_PER_TASK page ranges.
+    Raises PDFExtractionError if the document can't be read within TIMEOUT_SECONDS.
+    """
+    deadline = time.time() + TIMEOUT_SECONDS
+    try:
+        return _extract(content, deadline)
+    except BrokenProcessPool:
+        # Most likely another upload's timeout killed the shared workers mid-task;
+        # try once more on a fresh pool within the same deadline
+        try:
+            return _extract(content, deadline)
+        except BrokenProcessPool as e:
+            raise PDFExtractionError(f"PDF extraction worker died: {e}")
+
+def _extract(content: bytes, deadline: float) -> str:
+    pool = _get_pool()
+
+    def result_of(future):
+        try:
+            return future.result(timeout=max(0.0, deadline - time.time()))
+        except FutureTimeoutError:
+            _discard_pool(pool)
+            raise PDFExtractionError(f"PDF extraction exceeded {TIMEOUT_SECONDS}s")
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            raise
+        except Exception as e:
+            raise PDFExtractionError(str(e))
+
+    def submit(start, stop, char_budget):
+        try:
+            return pool.submit(_extract_pages, content, start, stop, char_budget, deadline)
+        except RuntimeError as e: # Shut down or broken by another extraction meanwhile
+            raise BrokenProcessPool(str(e))
+
+    # The first range also tells us how many pages there are
+    text, page_count = result_of(submit(0, min(PAGES_PER_TASK, MAX_PAGES), MAX_CHARS))
+    parts = [text]
+    extracted = len(text)
+    last_page = min(page_count, MAX_PAGES)
+
+    # Remaining ranges run in parallel, but only WORKERS ahead of the one being read
+    # so extraction stops soon after the character budget is met.
+    ranges = deque(range(PAGES_PER_TASK, last_page, PAGES_PER_TASK))
+    pending = deque()
+    try:
+        while extracted < MAX_CHARS and (ranges or pending):
+            while ranges and len(pending) < WORKERS:
+                start = ranges.popleft()
+                pending.append(submit(start, min(start + PAGES_PER_TASK, last_page), MAX_CHARS - extracted))
+            text, _ = result_of(pending.popleft())
+            parts.append(text)
+            extracted += len(text)
+            if time.time() > deadline:
+                break
+    finally:
+        for future in pending:
+            future.cancel()
+
+    return "".join(parts)[:MAX_CHARS]
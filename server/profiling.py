@@ -0,0 +1,198 @@
+import cProfile
+import io
+import itertools
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from sqlalchemy import event
+import log_utils
+
+# Slow-request capture. Every request keeps a light SQL log; a sampled share is
+# also run under cProfile. Requests slower than PROFILE_SLOW_REQUEST_SECONDS are
+# kept (newest PROFILE_MAX_STORED, per process) for GET /admin/profiles.
+SLOW_REQUEST_SECONDS = float(os.getenv("PROFILE_SLOW_REQUEST_SECONDS", "1.0")) # 0 disables capture
+SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0.1")) # Share of requests run under cProfile
+MAX_STORED = int(os.getenv("PROFILE_MAX_STORED", "50"))
+MAX_QUERIES = int(os.getenv("PROFILE_MAX_QUERIES", "200")) # SQL log entries kept per request
+# Only these route templates, e.g. "/resumes/upload,/recruiter/applicants" (empty: all)
+ROUTES = {r.strip() for r in os.getenv("PROFILE_ROUTES", "").split(",") if r.strip()}
+TOP_FUNCTIONS = 40
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar("profile_trace", default=None)
+_profiles = deque(maxlen=MAX_STORED)
+_profiles_lock = threading.Lock()
+_ids = itertools.count(1)
+_counts = {"captured": 0, "profiled": 0} # Since startup, including those since evicted
+# cProfile hooks one thread at a time and the event loop thread is shared, so
+# only one request is profiled at once; the others still get their SQL log
+_profiler_busy = threading.Lock()
+
+class _Trace:
+    def __init__(self, profiled: bool):
+        self.profiled = profiled
+        self.queries = []
+        self.query_count = 0
+        self.query_seconds = 0.0
+        self.stats = None # pstats.Stats merged from every profiled thread
+        self.lock = threading.Lock()
+
+    def add_profile(self, profiler: cProfile.Profile):
+        with self.lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profiler)
+            else:
+                self.stats.add(profiler)
+
+def _enable(profiler: cProfile.Profile) -> bool:
+    try:
+        profiler.enable()
+        return True
+    except ValueError: # Another profiler already owns this thread (or, on 3.12+, the interpreter)
+        return False
+
+def run_profiled(fn, *args, **kwargs):
+    """
+    Calls fn in the current thread, under cProfile if the request being served is
+    profiled. Used for work a request hands to the threadpool.
+    """
+    trace = _current.get()
+    if trace is None or not trace.profiled:
+        return fn(*args, **kwargs)
+    profiler = cProfile.Profile()
+    if not _enable(profiler):
+        return fn(*args, **kwargs)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        profiler.disable()
+        trace.add_profile(profiler)
+
+def log_queries(engine):
+    """
+    Records statements run on a (sync) engine in the current request's SQL log.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        trace = _current.get()
+        started = conn.info.get("profile_started")
+        if trace is None or not started:
+            return
+        duration = time.perf_counter() - started.pop()
+        with trace.lock:
+            trace.query_count += 1
+            trace.query_seconds += duration
+            if len(trace.queries) < MAX_QUERIES:
+                # Statements only: parameters can hold personal data
+                trace.queries.append({"statement": statement, "seconds": round(duration, 6), "rows": cursor.rowcount})
+
+def _top_functions(stats: pstats.Stats) -> str:
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    return out.getvalue()
+
+def _store(scope, status: int, duration: float, trace: _Trace):
+    route = getattr(scope.get("route"), "path", None) or scope.get("path")
+    record = {
+        "id": next(_ids),
+        "request_id": log_utils.request_id.get(),
+        "method": scope["method"],
+        "route": route,
+        "path": scope.get("path"),
+        "status": status,
+        "duration_seconds": round(duration, 6),
+        "started_at": time.time() - duration,
+        "query_count": trace.query_count,
+        "query_seconds": round(trace.query_seconds, 6),
+        "queries": trace.queries,
+        "profiled": trace.stats is not None,
+        # Rendered here so the request's threads can't still be adding to it
+        "profile": _top_functions(trace.stats) if trace.stats is not None else None,
+    }
+    with _profiles_lock:
+        _profiles.append(record)
+        _counts["captured"] += 1
+        _counts["profiled"] += record["profiled"]
+    logger.warning(
+        "Slow request %s %s took %.2fs", record["method"], route, duration,
+        extra={"profile_id": record["id"], "duration_seconds": record["duration_seconds"], "query_count": trace.query_count}
+    )
+
+def list_profiles() -> list:
+    with _profiles_lock:
+        profiles = list(_profiles)
+    return [
+        {k: v for k, v in p.items() if k not in ("queries", "profile")}
+        for p in reversed(profiles)
+    ]
+
+def get_profile(profile_id: int):
+    with _profiles_lock:
+        return next((p for p in _profiles if p["id"] == profile_id), None)
+
+def stats() -> dict:
+    with _profiles_lock:
+        return {"stored": len(_profiles), **_counts}
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that traces each request and keeps the slow ones. The event
+    loop thread's profile covers everything the loop ran meanwhile, including
+    other requests' coroutines; threadpool work is profiled per request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or SLOW_REQUEST_SECONDS <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        profiled = random.random() < SAMPLE_RATE and _profiler_busy.acquire(blocking=False)
+        trace = _Trace(profiled)
+        token = _current.set(trace)
+        profiler = None
+        if profiled:
+            profiler = cProfile.Profile()
+            if not _enable(profiler):
+                profiler = None
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            if profiler is not None:
+                profiler.disable()
+                trace.add_profile(profiler)
+            if profiled:
+                _profiler_busy.release()
+            _current.reset(token)
+
+            route = getattr(scope.get("route"), "path", None)
+            if duration >= SLOW_REQUEST_SECONDS and (not ROUTES or route in ROUTES):
+                try:
+                    _store(scope, status, duration, trace)
+                except Exception as e:
+                    logger.warning("Could not store slow request profile: %s", e)
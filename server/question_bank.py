@@ -0,0 +1,177 @@
+import hashlib
+import os
+import random
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+import models
+from skills import normalize_skill
+
+# Tests are assembled from a bank of LLM-generated questions per (skill, type)
+# filled offline by fill_question_bank.py. Skills without enough banked
+# questions fall back to live generation.
+QUESTION_TYPES = ("MCQ", "SYNTAX")
+QUESTIONS_PER_TYPE = 5
+
+# A (skill, type) pool is only sampled once it has this many live questions, so tests stay varied
+MIN_POOL = int(os.getenv("QUESTION_BANK_MIN_POOL", "15"))
+# Oldest questions beyond this many per (skill, type) are evicted on refill
+MAX_POOL = int(os.getenv("QUESTION_BANK_MAX_POOL", "200"))
+# Questions are retired after being served in this many tests
+MAX_SERVES = int(os.getenv("QUESTION_BANK_MAX_SERVES", "50"))
+# Store questions generated by the live fallback so the bank grows with use
+WRITE_THROUGH = os.getenv("QUESTION_BANK_WRITE_THROUGH", "true").lower() in ("1", "true", "yes")
+
+def _question_hash(text: str) -> str:
+    return hashlib.sha256(" ".join(str(text).split()).lower().encode("utf-8")).hexdigest()
+
+def _as_test_question(row: models.BankQuestion, skill_name: str) -> dict:
+    # Same shape generate_combined_test_content returns
+    return {
+        "skill": skill_name,
+        "type": row.question_type,
+        "question": row.question,
+        "options": row.options,
+        "correct_answer": row.correct_answer
+    }
+
+def sample_questions(db: Session, skills: list):
+    """
+    Draws QUESTIONS_PER_TYPE random live questions of each type for every skill
+    whose pools are large enough. Returns ({skill: [questions]}, [skills not covered]).
+    Marks the drawn questions as served; caller commits.
+    """
+    keys = {normalize_skill(s): s for s in skills}
+
+    # Ids only (index-covered), then sample in Python: portable and cheap for pools of a few hundred
+    candidates = (
+        db.query(models.BankQuestion.id, models.BankQuestion.skill, models.BankQuestion.question_type)
+        .filter(
+            models.BankQuestion.skill.in_(list(keys)),
+            models.BankQuestion.times_served < MAX_SERVES
+        )
+        .all()
+    )
+    pools = {}
+    for question_id, skill, question_type in candidates:
+        pools.setdefault((skill, question_type), []).append(question_id)
+
+    chosen = {}
+    missing = []
+    for key, skill_name in keys.items():
+        type_pools = [pools.get((key, t), []) for t in QUESTION_TYPES]
+        if any(len(pool) < max(MIN_POOL, QUESTIONS_PER_TYPE) for pool in type_pools):
+            missing.append(skill_name)
+            continue
+        for pool in type_pools:
+            for question_id in random.sample(pool, QUESTIONS_PER_TYPE):
+                chosen[question_id] = skill_name
+
+    if not chosen:
+        return {}, missing
+
+    rows = db.query(models.BankQuestion).filter(models.BankQuestion.id.in_(list(chosen))).all()
+    db.query(models.BankQuestion).filter(models.BankQuestion.id.in_(list(chosen))).update(
+        {models.BankQuestion.times_served: models.BankQuestion.times_served + 1},
+        synchronize_session=False
+    )
+
+    sampled = {}
+    for row in rows:
+        skill_name = chosen[row.id]
+        sampled.setdefault(skill_name, []).append(_as_test_question(row, skill_name))
+    return sampled, missing
+
+def add_questions(db: Session, questions: list) -> int:
+    """
+    Adds LLM-generated questions to the bank, skipping malformed ones and
+    duplicates of questions already banked for the skill. Caller commits.
+    """
+    incoming = {}
+    for q in questions:
+        if q.get("type") not in QUESTION_TYPES or not q.get("question") or not q.get("options") or not q.get("correct_answer"):
+            continue
+        key = normalize_skill(q.get("skill", ""))
+        if key:
+            incoming.setdefault((key, _question_hash(q["question"])), q)
+    if not incoming:
+        return 0
+
+    existing = set(
+        db.query(models.BankQuestion.skill, models.BankQuestion.question_hash)
+        .filter(models.BankQuestion.question_hash.in_([h for _, h in incoming]))
+        .all()
+    )
+    added = 0
+    for (key, question_hash), q in incoming.items():
+        if (key, question_hash) in existing:
+            continue
+        db.add(models.BankQuestion(
+            skill=key[:50],
+            skill_name=str(q["skill"])[:50],
+            question_type=q["type"],
+            question=q["question"],
+            question_hash=question_hash,
+            options=q["options"],
+            correct_answer=q["correct_answer"]
+        ))
+        added += 1
+    return added
+
+def pool_sizes(db: Session, skill: str) -> dict:
+    """
+    Number of live (not yet retired) questions per type for a skill.
+    """
+    rows = (
+        db.query(models.BankQuestion.question_type, func.count(models.BankQuestion.id))
+        .filter(
+            models.BankQuestion.skill == normalize_skill(skill),
+            models.BankQuestion.times_served < MAX_SERVES
+        )
+        .group_by(models.BankQuestion.question_type)
+        .all()
+    )
+    sizes = {t: 0 for t in QUESTION_TYPES}
+    sizes.update(dict(rows))
+    return sizes
+
+def recent_questions(db: Session, skill: str, limit: int) -> list:
+    """
+    Text of the newest banked questions for a skill, for prompts that ask the LLM not to repeat them.
+    """
+    return [
+        question for (question,) in db.query(models.BankQuestion.question)
+        .filter(models.BankQuestion.skill == normalize_skill(skill))
+        .order_by(models.BankQuestion.id.desc())
+        .limit(limit)
+        .all()
+    ]
+
+def evict(db: Session, skill: str) -> int:
+    """
+    Deletes retired questions and the oldest ones beyond MAX_POOL per type. Caller commits.
+    """
+    key = normalize_skill(skill)
+    removed = (
+        db.query(models.BankQuestion)
+        .filter(models.BankQuestion.skill == key, models.BankQuestion.times_served >= MAX_SERVES)
+        .delete(synchronize_session=False)
+    )
+    for question_type in QUESTION_TYPES:
+        keep_ids = [
+            question_id for (question_id,) in db.query(models.BankQuestion.id)
+            .filter(models.BankQuestion.skill == key, models.BankQuestion.question_type == question_type)
+            .order_by(models.BankQuestion.id.desc())
+            .limit(MAX_POOL)
+            .all()
+        ]
+        if len(keep_ids) == MAX_POOL:
+            removed += (
+                db.query(models.BankQuestion)
+                .filter(
+                    models.BankQuestion.skill == key,
+                    models.BankQuestion.question_type == question_type,
+                    models.BankQuestion.id < min(keep_ids)
+                )
+                .delete(synchronize_session=False)
+            )
+    return removed
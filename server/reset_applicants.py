@@ -6,7 +6,7 @@ def reset_applicants():
     db: Session = database.SessionLocal()
     try:
         print("⚠️  WARNING: This will delete ALL users with role='applicant' and their data.")
-        print("Resumes, Test Results, and Generated Tests will be wiped.")
+        print("Resumes, Resume Jobs, Test Results, and Generated Tests will be wiped.")
         confirm = input("Are you sure? Type 'DELETE' to confirm: ")
         
         if confirm != "DELETE":
@@ -25,8 +25,13 @@ def reset_applicants():
             # but iterative delete via relationship logic or manual foreign key cleanup is safer
             # if we wanted to be very careful. Here, direct deletion by ID is fine.
             
+            db.query(models.ApplicantSummary).filter(models.ApplicantSummary.user_id == app.id).delete()
             db.query(models.TestResult).filter(models.TestResult.user_id == app.id).delete()
             db.query(models.GeneratedTest).filter(models.GeneratedTest.user_id == app.id).delete()
+            db.query(models.ResumeJob).filter(models.ResumeJob.user_id == app.id).delete()
+            db.query(models.ResumeSkill).filter(
+                models.ResumeSkill.resume_id.in_(db.query(models.Resume.id).filter(models.Resume.user_id == app.id))
+            ).delete(synchronize_session=False)
             db.query(models.Resume).filter(models.Resume.user_id == app.id).delete()
             
             # Finally delete the user
@@ -0,0 +1,95 @@
+import datetime
+import hashlib
+import os
+import threading
+from sqlalchemy.orm import Session
+import models
+from cache_utils import TTLCache
+
+# Content-addressed reuse of resume extraction and LLM parsing. Re-uploads of the
+# same file (or of files that extract to the same text) skip pypdf and the LLM.
+# Lookups hit this process's LRU first, then earlier resume_jobs rows in the TTL window.
+CACHE_SIZE = int(os.getenv("RESUME_CACHE_SIZE", "512"))
+CACHE_TTL_SECONDS = int(os.getenv("RESUME_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+text_cache = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL_SECONDS) # sha256(file bytes) -> extracted text
+parsed_cache = TTLCache(maxsize=CACHE_SIZE, ttl=CACHE_TTL_SECONDS) # sha256(text) -> parsed JSON
+
+_db_hits = {"text": 0, "parsed": 0}
+_db_hits_lock = threading.Lock()
+
+def sha256_hex(data) -> str:
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+def _cutoff():
+    return datetime.datetime.utcnow() - datetime.timedelta(seconds=CACHE_TTL_SECONDS)
+
+def _count_db_hit(kind: str):
+    with _db_hits_lock:
+        _db_hits[kind] += 1
+
+def get_text(db: Session, content_hash: str):
+    text = text_cache.get(content_hash)
+    if text is not None:
+        return text
+
+    # text_sha256 is only recorded for successful extractions
+    row = (
+        db.query(models.ResumeJob.text_content)
+        .filter(
+            models.ResumeJob.content_sha256 == content_hash,
+            models.ResumeJob.text_sha256.isnot(None),
+            models.ResumeJob.created_at >= _cutoff()
+        )
+        .order_by(models.ResumeJob.id.desc())
+        .first()
+    )
+    if row is None:
+        return None
+    _count_db_hit("text")
+    text_cache.set(content_hash, row.text_content)
+    return row.text_content
+
+def put_text(content_hash: str, text: str):
+    text_cache.set(content_hash, text)
+
+def get_parsed(db: Session, text_hash: str):
+    parsed = parsed_cache.get(text_hash)
+    if parsed is not None:
+        return parsed
+
+    row = (
+        db.query(models.ResumeJob.parsed_content)
+        .filter(
+            models.ResumeJob.text_sha256 == text_hash,
+            models.ResumeJob.stage.in_(("save", "done")), # parse stage finished
+            models.ResumeJob.created_at >= _cutoff()
+        )
+        .order_by(models.ResumeJob.id.desc())
+        .first()
+    )
+    if row is None or row.parsed_content is None:
+        return None
+    _count_db_hit("parsed")
+    parsed_cache.set(text_hash, row.parsed_content)
+    return row.parsed_content
+
+def put_parsed(text_hash: str, parsed: dict):
+    parsed_cache.set(text_hash, parsed)
+
+def _layer_stats(cache: TTLCache, db_hits: int) -> dict:
+    layer = cache.stats()
+    lookups = layer["hits"] + layer["misses"]
+    layer["db_hits"] = db_hits
+    layer["overall_hit_rate"] = (layer["hits"] + db_hits) / lookups if lookups else 0.0
+    return layer
+
+def stats() -> dict:
+    with _db_hits_lock:
+        db_hits = dict(_db_hits)
+    return {
+        "text": _layer_stats(text_cache, db_hits["text"]),
+        "parsed": _layer_stats(parsed_cache, db_hits["parsed"]),
+    }
@@ -0,0 +1,45 @@
+import os
+import skill_extractor
+from llm_utils import parse_resume_content, summarize_resume_content
+
+# How resumes are parsed, per deployment:
+#   llm    - every resume goes to the LLM (original behaviour)
+#   hybrid - local rules first; the LLM only writes the summary (RESUME_LLM_SUMMARY)
+#            or does the full parse when the rules aren't confident
+#   rules  - never call the LLM; the summary is taken from the resume's own profile section
+PARSE_MODE = os.getenv("RESUME_PARSE_MODE", "hybrid").lower()
+MIN_CONFIDENCE = float(os.getenv("RESUME_RULES_MIN_CONFIDENCE", "0.75"))
+LLM_SUMMARY = os.getenv("RESUME_LLM_SUMMARY", "true").lower() in ("1", "true", "yes")
+
+def parse_resume(text: str, strict: bool = False) -> dict:
+    """
+    Same contract as llm_utils.parse_resume_content ({skills, experience_years,
+    summary}), plus "source" recording which path produced the result.
+    """
+    if PARSE_MODE == "llm":
+        parsed = parse_resume_content(text, strict=strict)
+        parsed["source"] = "llm"
+        return parsed
+
+    rules = skill_extractor.analyze(text)
+    confidence = rules.pop("confidence")
+
+    if PARSE_MODE == "rules":
+        rules["source"] = "rules"
+        return rules
+
+    if confidence < MIN_CONFIDENCE:
+        parsed = parse_resume_content(text, strict=strict)
+        parsed["source"] = "llm"
+        return parsed
+
+    if LLM_SUMMARY:
+        # Never strict: the rules already parsed the resume, so a failed summary
+        # falls back to theirs instead of failing the upload
+        summary = summarize_resume_content(text, strict=False)
+        if summary:
+            rules["summary"] = summary
+            rules["source"] = "rules+llm"
+            return rules
+    rules["source"] = "rules"
+    return rules
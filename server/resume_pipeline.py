@@ -0,0 +1,310 @@
+import datetime
+import io
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+import models, database
+from pdf_extraction import extract_pdf_text
+from supabase_utils import upload_to_supabase
+from resume_parser import parse_resume
+from resume_service import save_parsed_resume
+import resume_cache
+import metrics
+import log_utils
+
+logger = logging.getLogger(__name__)
+
+# Resume ingestion runs off the request path as a sequence of stages. Each stage
+# stores its output on the ResumeJob row, so a failed job resumes at the stage
+# that failed instead of starting over.
+STAGES = ("extract", "store", "parse", "save")
+
+WORKERS = int(os.getenv("RESUME_PIPELINE_WORKERS", "4"))
+# A job still "running" after this long is assumed lost (e.g. worker restart) and may be retried
+STALE_AFTER_SECONDS = int(os.getenv("RESUME_JOB_STALE_SECONDS", "600"))
+# While a stage runs its job's updated_at is refreshed this often, so a slow stage never looks stale
+HEARTBEAT_SECONDS = STALE_AFTER_SECONDS / 4
+# How often each process looks for queued or stale jobs nobody is working on (0 disables)
+RECOVERY_INTERVAL_SECONDS = float(os.getenv("RESUME_JOB_RECOVERY_SECONDS", "60"))
+
+executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="resume-pipeline")
+# Job ids waiting in or running on this process's executor, so recovery doesn't queue them twice
+_submitted = set()
+_submitted_lock = threading.Lock()
+
+STAGE_SECONDS = metrics.Histogram(
+    "resume_pipeline_stage_duration_seconds", "Time per resume job stage, including cache hits.",
+    ("stage", "outcome"), buckets=metrics.SLOW_BUCKETS
+)
+QUEUE_SECONDS = metrics.Histogram(
+    "resume_pipeline_queue_seconds", "Time a resume job waited for a pipeline worker.",
+    buckets=metrics.SLOW_BUCKETS
+)
+PDF_EXTRACTION_SECONDS = metrics.Histogram(
+    "pdf_extraction_duration_seconds", "PDF text extraction in the process pool (cache misses only).",
+    ("outcome",)
+)
+
+def _extract(db: Session, job: models.ResumeJob):
+    text_content = resume_cache.get_text(db, job.content_sha256)
+    if text_content is not None:
+        job.text_content = text_content
+        job.text_sha256 = resume_cache.sha256_hex(text_content)
+        return
+
+    try:
+        if job.content_type == "application/pdf":
+            # CPU-bound; runs in a process pool with page, time and character limits
+            with PDF_EXTRACTION_SECONDS.time():
+                text_content = extract_pdf_text(job.file_content)
+        else:
+            # Fallback for text files
+            text_content = job.file_content.decode("utf-8")
+    except Exception as e:
+        logger.warning("Could not extract resume text: %s", e, extra={"job_id": job.id})
+        # Not cached or hashed, so a later upload of the same file tries again
+        job.text_content = "Could not extract text. Attempting based on file metadata."
+        return
+
+    job.text_content = text_content
+    job.text_sha256 = resume_cache.sha256_hex(text_content)
+    resume_cache.put_text(job.content_sha256, text_content)
+
+def _store(db: Session, job: models.ResumeJob):
+    try:
+        job.file_url = upload_to_supabase(io.BytesIO(job.file_content), job.filename)
+    except Exception as e:
+        raise RuntimeError(f"Storage Upload Failed: {str(e)}")
+
+def _parse(db: Session, job: models.ResumeJob):
+    if job.text_sha256:
+        parsed = resume_cache.get_parsed(db, job.text_sha256)
+        if parsed is not None:
+            job.parsed_content = parsed
+            return
+
+    job.parsed_content = parse_resume(job.text_content, strict=True)
+    if job.text_sha256:
+        resume_cache.put_parsed(job.text_sha256, job.parsed_content)
+
+def _save(db: Session, job: models.ResumeJob):
+    # Committed only if the job's stage change is (see _advance), so a retry never saves twice
+    resume = save_parsed_resume(db, job.user_id, job.file_url, job.parsed_content)
+    job.resume_id = resume.id
+
+STAGE_HANDLERS = {
+    "extract": _extract,
+    "store": _store,
+    "parse": _parse,
+    "save": _save,
+}
+
+def create_job(db: Session, user_id: int, filename: str, content_type: str, content: bytes) -> models.ResumeJob:
+    extension = (filename or "resume.pdf").split(".")[-1]
+    job = models.ResumeJob(
+        user_id=user_id,
+        status="queued",
+        stage=STAGES[0],
+        filename=f"resume_{user_id}_{int(time.time())}.{extension}",
+        content_type=content_type,
+        file_content=content,
+        content_sha256=resume_cache.sha256_hex(content)
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def can_retry(job: models.ResumeJob) -> bool:
+    if job.status == "failed":
+        return True
+    if job.status in ("queued", "running") and job.updated_at:
+        return (datetime.datetime.utcnow() - job.updated_at).total_seconds() > STALE_AFTER_SECONDS
+    return False
+
+def retry_job(db: Session, job: models.ResumeJob):
+    """
+    Re-queues a failed (or stale) job; it picks up at the stage recorded on the row.
+    """
+    job.status = "queued"
+    job.error = None
+    db.commit()
+    submit(job.id)
+
+def submit(job_id: int):
+    with _submitted_lock:
+        if job_id in _submitted:
+            return
+        _submitted.add(job_id)
+    # The uploading request's id follows the job, so its log lines can be correlated
+    executor.submit(run_job, job_id, time.perf_counter(), log_utils.request_id.get())
+
+def _claim(db: Session, job_id: int) -> bool:
+    # queued -> running in one statement, so when several processes were handed
+    # the same job (see recover_jobs) only one of them runs it
+    claimed = (
+        db.query(models.ResumeJob)
+        .filter(models.ResumeJob.id == job_id, models.ResumeJob.status == "queued")
+        .update({
+            models.ResumeJob.status: "running",
+            models.ResumeJob.attempts: func.coalesce(models.ResumeJob.attempts, 0) + 1,
+            models.ResumeJob.updated_at: datetime.datetime.utcnow(),
+        }, synchronize_session=False)
+    )
+    db.commit()
+    return claimed == 1
+
+@contextmanager
+def _heartbeat(job_id: int):
+    """
+    Keeps a running job's updated_at fresh in the background, so recover_jobs
+    doesn't hand it to another worker while a slow stage is still working on it.
+    """
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(HEARTBEAT_SECONDS):
+            db: Session = database.SessionLocal()
+            try:
+                (
+                    db.query(models.ResumeJob)
+                    .filter(models.ResumeJob.id == job_id, models.ResumeJob.status == "running")
+                    .update({models.ResumeJob.updated_at: datetime.datetime.utcnow()}, synchronize_session=False)
+                )
+                db.commit()
+            except Exception as e:
+                logger.warning("Resume job %s heartbeat failed: %s", job_id, e, extra={"job_id": job_id})
+                db.rollback()
+            finally:
+                db.close()
+
+    threading.Thread(target=beat, name=f"resume-job-heartbeat-{job_id}", daemon=True).start()
+    try:
+        yield
+    finally:
+        stop.set()
+
+def _advance(db: Session, job_id: int, stage: str, next_stage: str) -> bool:
+    # Moves the job on only if it is still at the stage this worker ran, in the same
+    # transaction as the stage's output. If a worker that took the job over got there
+    # first, no row matches and the caller rolls its output (e.g. a second Resume) back.
+    query = db.query(models.ResumeJob).filter(
+        models.ResumeJob.id == job_id,
+        models.ResumeJob.stage == stage,
+        models.ResumeJob.status == "running",
+    )
+    if stage == "save":
+        query = query.filter(models.ResumeJob.resume_id.is_(None))
+    # SessionLocal doesn't autoflush, so this runs before the stage's own writes
+    # (save's resume_id included) and the commit after it flushes them
+    advanced = query.update({
+        models.ResumeJob.stage: next_stage,
+        models.ResumeJob.updated_at: datetime.datetime.utcnow(),
+    }, synchronize_session=False)
+    return advanced == 1
+
+def run_job(job_id: int, submitted_at: float = None, request_id: str = None):
+    try:
+        _run_job(job_id, submitted_at, request_id)
+    finally:
+        with _submitted_lock:
+            _submitted.discard(job_id)
+
+def _run_job(job_id: int, submitted_at: float = None, request_id: str = None):
+    if submitted_at is not None:
+        QUEUE_SECONDS.observe(time.perf_counter() - submitted_at)
+    log_utils.request_id.set(request_id)
+    db: Session = database.SessionLocal()
+    try:
+        if not _claim(db, job_id):
+            return
+        job = db.get(models.ResumeJob, job_id)
+
+        while job.stage in STAGE_HANDLERS:
+            stage = job.stage
+            try:
+                with _heartbeat(job_id), STAGE_SECONDS.time(stage=stage):
+                    STAGE_HANDLERS[stage](db, job)
+                next_stage = STAGES[STAGES.index(stage) + 1] if stage != STAGES[-1] else "done"
+                if not _advance(db, job_id, stage, next_stage):
+                    logger.warning("Resume job %s was taken over during '%s'; dropping this run", job_id, stage, extra={"job_id": job_id, "stage": stage})
+                    db.rollback()
+                    return
+                db.commit()
+            except Exception as e:
+                logger.warning("Resume job %s failed at '%s': %s", job_id, stage, e, extra={"job_id": job_id, "stage": stage})
+                db.rollback()
+                # Same check as _advance: don't fail a job another worker has taken over
+                (
+                    db.query(models.ResumeJob)
+                    .filter(models.ResumeJob.id == job_id, models.ResumeJob.stage == stage, models.ResumeJob.status == "running")
+                    .update({models.ResumeJob.status: "failed", models.ResumeJob.error: f"{stage}: {str(e)}"}, synchronize_session=False)
+                )
+                db.commit()
+                return
+
+        job.status = "completed"
+        job.file_content = None
+        db.commit()
+
+    except Exception as e:
+        logger.exception("Resume job %s crashed", job_id, extra={"job_id": job_id})
+        db.rollback()
+    finally:
+        db.close()
+
+def recover_jobs() -> int:
+    """
+    Submits jobs that nobody is working on: queued ones (their process may have
+    restarted before running them) and running ones older than STALE_AFTER_SECONDS.
+    Other processes may pick up the same jobs; the claim in run_job lets only one
+    run each. Returns how many were submitted.
+    """
+    db: Session = database.SessionLocal()
+    try:
+        stale_before = datetime.datetime.utcnow() - datetime.timedelta(seconds=STALE_AFTER_SECONDS)
+        (
+            db.query(models.ResumeJob)
+            .filter(models.ResumeJob.status == "running", models.ResumeJob.updated_at < stale_before)
+            .update({models.ResumeJob.status: "queued"}, synchronize_session=False)
+        )
+        db.commit()
+        job_ids = [
+            job_id for (job_id,) in db.query(models.ResumeJob.id)
+            .filter(models.ResumeJob.status == "queued")
+            .order_by(models.ResumeJob.id)
+            .all()
+        ]
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        submit(job_id)
+    if job_ids:
+        logger.info("Recovered %d resume jobs", len(job_ids), extra={"job_ids": job_ids[:50]})
+    return len(job_ids)
+
+def _recover_periodically():
+    while True:
+        try:
+            recover_jobs()
+        except Exception as e:
+            logger.warning("Resume job recovery failed: %s", e)
+        time.sleep(RECOVERY_INTERVAL_SECONDS)
+
+_recovery_thread = None
+
+def start_recovery():
+    """
+    Runs recover_jobs() now (in the background) and every RECOVERY_INTERVAL_SECONDS.
+    """
+    global _recovery_thread
+    if RECOVERY_INTERVAL_SECONDS <= 0 or _recovery_thread is not None:
+        return
+    _recovery_thread = threading.Thread(target=_recover_periodically, name="resume-job-recovery", daemon=True)
+    _recovery_thread.start()
@@ -0,0 +1,43 @@
+from sqlalchemy.orm import Session
+import models
+import applicant_summary
+from skills import normalize_skill
+
+def _experience_years(parsed_data: dict):
+    try:
+        return int(parsed_data.get("experience_years") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+def apply_parsed_fields(resume: models.Resume, parsed_data: dict):
+    """
+    Copies the searchable parts of an LLM parse (skills, experience) out of the JSON
+    blob into resume_skills rows and the indexed experience_years column.
+    """
+    parsed_data = parsed_data or {}
+    resume.experience_years = _experience_years(parsed_data)
+
+    seen = set()
+    skill_rows = []
+    for name in parsed_data.get("skills") or []:
+        key = normalize_skill(name)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        skill_rows.append(models.ResumeSkill(skill=key[:50], name=str(name).strip()[:50]))
+    resume.skills = skill_rows
+
+def save_parsed_resume(db: Session, user_id: int, file_url: str, parsed_data: dict) -> models.Resume:
+    """
+    Adds the resume with its skill rows and moves the applicant summary to it. Caller commits.
+    """
+    new_resume = models.Resume(
+        user_id=user_id,
+        file_url=file_url,
+        parsed_content=parsed_data
+    )
+    apply_parsed_fields(new_resume, parsed_data)
+    db.add(new_resume)
+    db.flush()
+    applicant_summary.record_resume(db, new_resume)
+    return new_resume
@@ -0,0 +1,26 @@
+import auth, profiling
+from clients import registry
+from fastapi import APIRouter, Depends, HTTPException
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(auth.get_current_admin)]
+)
+
+@router.get("/profiles")
+def list_profiles():
+    # Slow requests captured by this worker, newest first (see profiling.py)
+    return profiling.list_profiles()
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: int):
+    profile = profiling.get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+@router.get("/clients")
+def client_health(probe: bool = False):
+    # probe=true creates any clients not built yet and calls each service
+    return registry.health(probe=probe)
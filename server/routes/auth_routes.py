@@ -1,54 +1,96 @@
+import logging
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
 import models, schemas, database, auth
+import applicant_summary
+from password_hashing import hasher, HasherBusy
 
 router = APIRouter(
     prefix="/auth",
     tags=["Authentication"]
 )
 
+logger = logging.getLogger(__name__)
+
+def _check_new_user(db: Session, user: schemas.UserCreate):
+    # Check if user exists
+    db_user = db.query(models.User).filter(models.User.email == user.email).first()
+    if db_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    
+    # Check if username exists
+    db_username = db.query(models.User).filter(models.User.username == user.username).first()
+    if db_username:
+        raise HTTPException(status_code=400, detail="Username already taken")
+
+def _create_user(db: Session, user: schemas.UserCreate, hashed_password: str):
+    new_user = models.User(
+        username=user.username,
+        email=user.email,
+        password_hash=hashed_password,
+        role=user.role
+    )
+    if new_user.role == "applicant":
+        applicant_summary.create_summary(new_user)
+    db.add(new_user)
+    db.commit()
+    db.refresh(new_user)
+    return new_user
+
+def _update_password_hash(db: Session, user_id: int, password_hash: str):
+    # Through the instance rather than a bulk update, so only this user's cached identity is dropped
+    user = db.get(models.User, user_id)
+    if user is None:
+        return
+    user.password_hash = password_hash
+    db.commit()
+
+def _busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins right now, please try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/signup", response_model=schemas.UserResponse)
-def signup(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
+async def signup(user: schemas.UserCreate, runner: database.SessionRunner = Depends(database.get_runner)):
     try:
-        # Check if user exists
-        db_user = db.query(models.User).filter(models.User.email == user.email).first()
-        if db_user:
-            raise HTTPException(status_code=400, detail="Email already registered")
-        
-        # Check if username exists
-        db_username = db.query(models.User).filter(models.User.username == user.username).first()
-        if db_username:
-            raise HTTPException(status_code=400, detail="Username already taken")
-
-        # Create new user
-        hashed_password = auth.get_password_hash(user.password)
-        new_user = models.User(
-            username=user.username,
-            email=user.email,
-            password_hash=hashed_password,
-            role=user.role
-        )
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
-        return new_user
+        await runner.run(_check_new_user, user)
+
+        # Create new user (Argon2 is slow: runs on the password hashing pool)
+        hashed_password = await hasher.hash(user.password)
+        return await runner.run(_create_user, user, hashed_password)
+    except HasherBusy:
+        raise _busy()
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"ERROR: {e}") # Print to console
+        logger.exception("Signup failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(database.get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), runner: database.SessionRunner = Depends(database.get_runner)):
     # Note: OAuth2PasswordRequestForm expects 'username' field, which we use for 'email'
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.password_hash):
+    user = await runner.run(auth.get_user_by_email, form_data.username)
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await hasher.verify_and_update(form_data.password, user.password_hash)
+        except HasherBusy:
+            raise _busy()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    if new_hash:
+        # Stored with older Argon2 parameters; upgrade while we have the plain password
+        await runner.run(_update_password_hash, user.id, new_hash)
+
     access_token = auth.create_access_token(data={"sub": user.email, "role": user.role, "username": user.username})
     return {"access_token": access_token, "token_type": "bearer"}
 
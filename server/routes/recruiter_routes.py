@@ -1,50 +1,119 @@
 import models, database, auth
-from fastapi import APIRouter, Depends, HTTPException
+from skills import matching_skill_keys
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import and_, desc, exists, or_
+import base64, binascii, datetime, json, math
 
 router = APIRouter(
     prefix="/recruiter",
     tags=["Recruiter"]
 )
 
-@router.get("/applicants")
-def get_all_applicants(
-    skill: str | None = None,
-    min_score: int | None = None,
-    sort_by: str = "date_desc", # date_desc, score_desc, exp_desc
-    current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(database.get_db)
-):
-    if current_user.role != "recruiter":
-        raise HTTPException(status_code=403, detail="Access denied. Recruiter only.")
+SORT_OPTIONS = ("date_desc", "score_desc", "exp_desc")
+
+def _encode_cursor(sort_by: str, sort_value, last_id: int) -> str:
+    if isinstance(sort_value, datetime.datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps({"sort": sort_by, "value": sort_value, "id": last_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def _decode_cursor(cursor: str, sort_by: str):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if payload["sort"] != sort_by:
+            raise ValueError("cursor was issued for a different sort order")
+        sort_value = payload["value"]
+        # Typed here so a tampered value is a 400, not a database error
+        if isinstance(sort_value, bool):
+            raise ValueError("value must not be a boolean")
+        if sort_by == "date_desc":
+            sort_value = datetime.datetime.fromisoformat(sort_value)
+        elif sort_by == "score_desc":
+            sort_value = float(sort_value)
+            if not math.isfinite(sort_value):
+                raise ValueError("score must be finite")
+        else: # exp_desc
+            sort_value = int(sort_value)
+        return sort_value, int(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError, OverflowError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+def list_applicants(db: Session, skill: str | None = None, min_score: int | None = None,
+                    sort_by: str = "date_desc", limit: int = 50, cursor: str | None = None):
+    """
+    One page of applicants for the recruiter dashboard. Returns (applicants, next cursor or None).
+    """
+    if sort_by not in SORT_OPTIONS:
+        sort_by = "date_desc"
+
+    # Every applicant has a summary row pointing at their latest resume and its
+    # result, so one statement of primary-key joins builds the whole page.
+    query = (
+        db.query(models.User, models.ApplicantSummary, models.Resume, models.TestResult)
+        .select_from(models.ApplicantSummary)
+        .join(models.User, models.User.id == models.ApplicantSummary.user_id)
+        .outerjoin(models.Resume, models.Resume.id == models.ApplicantSummary.resume_id)
+        .outerjoin(models.TestResult, models.TestResult.id == models.ApplicantSummary.test_result_id)
+        .filter(models.User.role == "applicant")
+    )
+
+    # --- Filtering ---
+    # 1. Skill Filter: the search is expanded to known skill keys so this is an index lookup
+    if skill:
+        query = query.filter(exists().where(
+            models.ResumeSkill.resume_id == models.ApplicantSummary.resume_id,
+            models.ResumeSkill.skill.in_(matching_skill_keys(skill))
+        ))
+
+    # 2. Score Filter (applicants without a result count as 0)
+    if min_score is not None:
+        query = query.filter(models.ApplicantSummary.score >= min_score)
+
+    # --- Sorting & keyset pagination ---
+    # User id breaks ties so the order is total and a cursor never skips or repeats rows;
+    # each (sort column, user_id) pair has a matching index on applicant_summaries.
+    if sort_by == "score_desc":
+        sort_key = models.ApplicantSummary.score
+    elif sort_by == "exp_desc":
+        sort_key = models.ApplicantSummary.experience_years
+    else: # date_desc default
+        sort_key = models.ApplicantSummary.last_upload_at
+
+    if cursor:
+        last_value, last_id = _decode_cursor(cursor, sort_by)
+        query = query.filter(or_(
+            sort_key < last_value,
+            and_(sort_key == last_value, models.ApplicantSummary.user_id < last_id)
+        ))
+
+    rows = (
+        query.order_by(desc(sort_key), desc(models.ApplicantSummary.user_id))
+        .limit(limit + 1)
+        .all()
+    )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last_row = rows[-1]
+        last_value = getattr(last_row.ApplicantSummary, sort_key.key)
+        next_cursor = _encode_cursor(sort_by, last_value, last_row.User.id)
 
-    # Fetch all applicants
-    applicants = db.query(models.User).filter(models.User.role == "applicant").all()
-    
     applicant_data = []
-    for app in applicants:
-        # Get latest resume
-        latest_resume = db.query(models.Resume).filter(models.Resume.user_id == app.id).order_by(desc(models.Resume.created_at)).first()
-        
+    for app, summary, latest_resume, test_result in rows:
         resume_info = None
         test_result_info = None
-        skills_list = []
-        score_val = 0
-        exp_years = 0
-        
+
         if latest_resume:
-            skills_list = latest_resume.parsed_content.get("skills", []) if latest_resume.parsed_content else []
-            exp_years = latest_resume.parsed_content.get("experience_years", 0) if latest_resume.parsed_content else 0
-            
+            parsed_content = latest_resume.parsed_content or {}
             resume_info = {
                 "file_url": latest_resume.file_url,
-                "skills": skills_list,
-                "experience_years": exp_years
+                "skills": parsed_content.get("skills", []),
+                "experience_years": summary.experience_years
             }
-            
-            # Get latest test result for this resume
-            test_result = db.query(models.TestResult).filter(models.TestResult.resume_id == latest_resume.id).first()
+
             if test_result:
                 test_result_info = {
                     "score": test_result.score,
@@ -53,37 +122,31 @@ def get_all_applicants(
                     "details": test_result.details
                 }
 
-        # --- Filtering ---
-        # 1. Skill Filter
-        if skill:
-            skill_lower = skill.lower()
-            # Check if ANY skill contains the search string
-            has_skill = any(skill_lower in s.lower() for s in skills_list)
-            if not has_skill:
-                continue
-
-        # 2. Score Filter
-        if min_score is not None:
-            if score_val < min_score:
-                continue
-
         applicant_data.append({
             "id": app.id,
             "username": app.username,
             "email": app.email,
             "resume": resume_info,
-            "test_result": test_result_info,
-            "_sort_score": score_val,
-            "_sort_exp": exp_years,
-            "_sort_date": latest_resume.created_at if latest_resume else app.created_at
+            "test_result": test_result_info
         })
-    
-    # --- Sorting ---
-    if sort_by == "score_desc":
-        applicant_data.sort(key=lambda x: x["_sort_score"] or 0, reverse=True)
-    elif sort_by == "exp_desc":
-        applicant_data.sort(key=lambda x: x["_sort_exp"] or 0, reverse=True)
-    else: # date_desc default
-        applicant_data.sort(key=lambda x: x["_sort_date"], reverse=True)
 
+    return applicant_data, next_cursor
+
+@router.get("/applicants")
+async def get_all_applicants(
+    response: Response,
+    skill: str | None = None,
+    min_score: int | None = None,
+    sort_by: str = "date_desc", # date_desc, score_desc, exp_desc
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None, # value of the X-Next-Cursor header from the previous page
+    current_user: models.User = Depends(auth.get_current_user),
+    runner: database.SessionRunner = Depends(database.get_runner)
+):
+    if current_user.role != "recruiter":
+        raise HTTPException(status_code=403, detail="Access denied. Recruiter only.")
+
+    applicant_data, next_cursor = await runner.run(list_applicants, skill, min_score, sort_by, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return applicant_data
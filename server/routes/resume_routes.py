@@ -1,85 +1,106 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
 from sqlalchemy.orm import Session
 import models, database, auth
-from supabase_utils import upload_to_supabase
-from llm_utils import parse_resume_content
-from pypdf import PdfReader
-import io, time
+import applicant_summary
+import resume_pipeline
 
 router = APIRouter(
     prefix="/resumes",
     tags=["Resumes"]
 )
 
-@router.post("/upload")
+@router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_resume(
     file: UploadFile = File(...),
     current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(database.get_db)
+    runner: database.SessionRunner = Depends(database.get_runner)
 ):
     if current_user.role != "applicant":
         raise HTTPException(status_code=403, detail="Only applicants can upload resumes")
 
     # 1. Read file content
     content = await file.read()
-    
-    # 2. Extract text (assuming PDF for now)
-    text_content = ""
-    try:
-        if file.content_type == "application/pdf":
-            pdf_file = io.BytesIO(content)
-            reader = PdfReader(pdf_file)
-            for page in reader.pages:
-                text_content += page.extract_text()
-        else:
-            # Fallback for text files
-            text_content = content.decode("utf-8")
-    except Exception as e:
-        print(f"Error reading file: {e}")
-        text_content = "Could not extract text. Attempting based on file metadata."
-
-    # 3. Upload to Supabase
-    try:
-        # Reset pointer for upload
-        file_obj = io.BytesIO(content)
-        # Use sanitized filename
-        filename = f"resume_{current_user.id}_{int(time.time())}.{file.filename.split('.')[-1]}"
-        file_url = upload_to_supabase(file_obj, filename)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Storage Upload Failed: {str(e)}")
-
-    # 4. Parse with LLM
-    parsed_data = parse_resume_content(text_content)
-
-    # 5. Save to Database
-    new_resume = models.Resume(
-        user_id=current_user.id,
-        file_url=file_url,
-        parsed_content=parsed_data
-    )
-    db.add(new_resume)
-    db.commit()
-    db.refresh(new_resume)
+
+    # 2. Queue extraction -> storage -> LLM parse -> save; poll /resumes/jobs/{job_id} for the result
+    job = await runner.run(resume_pipeline.create_job, current_user.id, file.filename, file.content_type, content)
+    resume_pipeline.submit(job.id)
 
     return {
-        "message": "Resume uploaded and parsed successfully",
-        "resume_id": new_resume.id,
-        "file_url": file_url,
-        "parsed_data": parsed_data
+        "message": "Resume received, processing started",
+        "job_id": job.id,
+        "status": job.status
     }
 
-@router.get("/my-resume")
-def get_my_resume(
-    current_user: models.User = Depends(auth.get_current_user), 
-    db: Session = Depends(database.get_db)
+def _job_response(job: models.ResumeJob):
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "error": job.error,
+        "attempts": job.attempts,
+        "resume_id": job.resume_id,
+        "file_url": job.file_url,
+        "parsed_data": job.parsed_content if job.status == "completed" else None,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
+
+def _get_own_job(db: Session, job_id: int, current_user: models.User) -> models.ResumeJob:
+    job = db.query(models.ResumeJob).filter(models.ResumeJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this job")
+    return job
+
+@router.get("/jobs/{job_id}")
+async def get_resume_job(
+    job_id: int,
+    current_user: models.User = Depends(auth.get_current_user),
+    runner: database.SessionRunner = Depends(database.get_runner)
+):
+    job = await runner.run(_get_own_job, job_id, current_user)
+    return _job_response(job)
+
+def _retry_job(db: Session, job_id: int, current_user: models.User):
+    job = _get_own_job(db, job_id, current_user)
+    if not resume_pipeline.can_retry(job):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status} and cannot be retried.")
+
+    # Resumes from the stage that failed; earlier stage outputs are kept on the job
+    resume_pipeline.retry_job(db, job)
+    return job
+
+@router.post("/jobs/{job_id}/retry", status_code=status.HTTP_202_ACCEPTED)
+async def retry_resume_job(
+    job_id: int,
+    current_user: models.User = Depends(auth.get_current_user),
+    runner: database.SessionRunner = Depends(database.get_runner)
 ):
-    resume = db.query(models.Resume).filter(models.Resume.user_id == current_user.id).order_by(models.Resume.created_at.desc()).first()
-    if not resume:
+    job = await runner.run(_retry_job, job_id, current_user)
+    return _job_response(job)
+
+def _summary_with_resume(db: Session, user_id: int):
+    return (
+        db.query(models.ApplicantSummary, models.Resume)
+        .outerjoin(models.Resume, models.Resume.id == models.ApplicantSummary.resume_id)
+        .filter(models.ApplicantSummary.user_id == user_id)
+        .first()
+    )
+
+def _my_resume(db: Session, current_user: models.User):
+    # The summary row points straight at the latest resume and its test result
+    row = _summary_with_resume(db, current_user.id)
+    if row is None and current_user.role == "applicant":
+        # Accounts from before summaries existed get theirs built on first visit
+        applicant_summary.rebuild_summaries(db, [current_user.id])
+        db.commit()
+        row = _summary_with_resume(db, current_user.id)
+    if row is None or row[1] is None:
         raise HTTPException(status_code=404, detail="No resume found")
-    
-    # Check if a test result exists for this resume
-    # We check relationships or query strictly (relationship is safer/easier if eager loaded or lazy loaded within session)
-    has_test = db.query(models.TestResult).filter(models.TestResult.resume_id == resume.id).first() is not None
+
+    summary, resume = row
+    has_test = summary.test_result_id is not None
 
     return {
         "id": resume.id,
@@ -88,3 +109,10 @@ def get_my_resume(
         "created_at": resume.created_at,
         "has_taken_test": has_test
     }
+
+@router.get("/my-resume")
+async def get_my_resume(
+    current_user: models.User = Depends(auth.get_current_user), 
+    runner: database.SessionRunner = Depends(database.get_runner)
+):
+    return await runner.run(_my_resume, current_user)
@@ -1,7 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 import models, database, auth
+import applicant_summary
+import question_bank
 from llm_utils import generate_combined_test_content
+from singleflight import SingleFlight
+import asyncio
+import datetime
+import json
+import logging
+import os
 import random
 
 router = APIRouter(
@@ -9,12 +20,122 @@ router = APIRouter(
     tags=["Tests"]
 )
 
-@router.post("/generate")
-def generate_test(
-    resume_id: int,
-    current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(database.get_db)
-):
+# An unsubmitted test generated this recently for the same resume is handed out
+# again instead of generating another one (0 disables)
+REUSE_SECONDS = int(os.getenv("GENERATED_TEST_REUSE_SECONDS", "300"))
+
+generation_flight = SingleFlight()
+
+logger = logging.getLogger(__name__)
+
+def _discard_partial_test(db: Session, test):
+    # A streamed test whose generation failed; the client was sent an error for it
+    if test is not None:
+        db.delete(test)
+        db.commit()
+
+def _create_test(db: Session, user_id: int, resume_id: int, skills: list, on_questions=None):
+    """
+    Returns (test_id, questions with answers), reusing a recent GeneratedTest for
+    the resume or drawing/generating and saving a new one.
+
+    With on_questions(test_id, offset, questions) the test row is created before any
+    LLM call and each batch is reported as soon as it's ready (banked questions
+    first, then one batch per generated skill); offset is the batch's position in
+    the saved list, i.e. the questions' virtual ids. Called from worker threads.
+    """
+    if REUSE_SECONDS > 0:
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=REUSE_SECONDS)
+        recent = (
+            db.query(models.GeneratedTest)
+            .filter(
+                models.GeneratedTest.resume_id == resume_id,
+                models.GeneratedTest.user_id == user_id,
+                models.GeneratedTest.created_at >= cutoff,
+                models.GeneratedTest.complete.is_(True)
+            )
+            .order_by(models.GeneratedTest.id.desc())
+            .first()
+        )
+        if recent and recent.questions:
+            return recent.id, recent.questions
+
+    # Draw Questions (MCQ + Syntax) from the question bank; skills it can't cover yet go to the LLM
+    banked, missing_skills = question_bank.sample_questions(db, skills)
+    raw_questions = [q for skill_questions in banked.values() for q in skill_questions]
+
+    new_test = None
+    on_batch = None
+    if on_questions:
+        # Not reusable until every batch is in (other processes could otherwise hand it out)
+        new_test = models.GeneratedTest(user_id=user_id, resume_id=resume_id, questions=list(raw_questions), complete=False)
+        db.add(new_test)
+        db.commit()
+        db.refresh(new_test)
+        if raw_questions:
+            on_questions(new_test.id, 0, list(raw_questions))
+
+        streamed = []
+        def on_batch(skill, questions):
+            # Runs on the LLM gateway's loop thread, one batch at a time
+            offset = len(raw_questions) + len(streamed)
+            streamed.extend(questions)
+            on_questions(new_test.id, offset, questions)
+
+    generated = []
+    if missing_skills:
+        try:
+            generated = generate_combined_test_content(missing_skills, on_batch=on_batch)
+        except Exception as e:
+            _discard_partial_test(db, new_test)
+            raise HTTPException(status_code=500, detail=f"LLM Generation Failed: {str(e)}")
+        # Streamed questions keep the order (and so the ids) they were sent in
+        raw_questions.extend(streamed if on_questions else generated)
+
+    if not raw_questions:
+        _discard_partial_test(db, new_test)
+        raise HTTPException(status_code=500, detail="Failed to generate questions.")
+
+    # Save COMPLETE Test (with answers) to Database
+    if new_test is None:
+        new_test = models.GeneratedTest(
+            user_id=user_id,
+            resume_id=resume_id,
+            questions=raw_questions
+        )
+        db.add(new_test)
+    else:
+        new_test.questions = raw_questions
+        new_test.complete = True
+    db.commit()
+    db.refresh(new_test)
+
+    if generated and question_bank.WRITE_THROUGH:
+        # Best effort: a concurrent insert of the same question must not fail the request
+        try:
+            question_bank.add_questions(db, generated)
+            db.commit()
+        except Exception as e:
+            logger.warning("Question bank write-through failed: %s", e)
+            db.rollback()
+
+    return new_test.id, raw_questions
+
+def _sanitize_questions(questions: list, offset: int = 0) -> list:
+    # Remove answers; the virtual id is the question's index in GeneratedTest.questions
+    sanitized_questions = []
+    for idx, q in enumerate(questions, start=offset):
+        sanitized_questions.append({
+            "id": idx, # Virtual ID for tracking answers
+            "skill": q.get("skill"),
+            "type": q.get("type"),
+            "question": q.get("question"),
+            "options": q.get("options")
+        })
+    random.shuffle(sanitized_questions)
+    return sanitized_questions
+
+def _resume_skills(db: Session, resume_id: int, current_user: models.User):
     # 1. Verify Resume Ownership
     resume = db.query(models.Resume).filter(models.Resume.id == resume_id).first()
     if not resume:
@@ -35,58 +156,115 @@ def generate_test(
     skills = parsed_content["skills"]
     if not skills:
         raise HTTPException(status_code=400, detail="No valid skills found in resume.")
+    return resume, skills
 
-    # 3. Generate Questions (MCQ + Syntax) via Gemini
+def _generate(user_id: int, resume_id: int, skills: list, on_questions=None):
+    """
+    Runs on a worker thread with its own session, since it waits on the LLM.
+    One test per resume at a time: double clicks and client retries share it.
+    """
+    db = database.SessionLocal()
     try:
-        raw_questions = generate_combined_test_content(skills)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"LLM Generation Failed: {str(e)}")
+        return generation_flight.do(
+            ("generate_test", resume_id),
+            lambda: _create_test(db, user_id, resume_id, skills, on_questions)
+        )
+    finally:
+        db.close()
 
-    if not raw_questions:
-        raise HTTPException(status_code=500, detail="Failed to generate questions.")
+@router.post("/generate")
+async def generate_test(
+    resume_id: int,
+    current_user: models.User = Depends(auth.get_current_user),
+    runner: database.SessionRunner = Depends(database.get_runner)
+):
+    resume, skills = await runner.run(_resume_skills, resume_id, current_user)
 
-    # 4. Save COMPLETE Test (with answers) to Database
-    new_test = models.GeneratedTest(
-        user_id=current_user.id,
-        resume_id=resume.id,
-        questions=raw_questions
-    )
-    db.add(new_test)
-    db.commit()
-    db.refresh(new_test)
+    # 3-4. Draw/generate and save the test
+    test_id, raw_questions = await run_in_threadpool(_generate, current_user.id, resume.id, skills)
 
     # 5. Sanitize Questions (Remove Answer) & Shuffle
-    sanitized_questions = []
-    for idx, q in enumerate(raw_questions):
-        sanitized_questions.append({
-            "id": idx, # Virtual ID for tracking answers
-            "skill": q.get("skill"),
-            "type": q.get("type"),
-            "question": q.get("question"),
-            "options": q.get("options")
-        })
-    
-    random.shuffle(sanitized_questions)
+    sanitized_questions = _sanitize_questions(raw_questions)
 
     return {
-        "test_id": new_test.id,
+        "test_id": test_id,
         "questions": sanitized_questions,
         "total_questions": len(sanitized_questions)
     }
 
+def _format_event(format: str, event: str, data: dict) -> str:
+    if format == "sse":
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, **data}) + "\n"
+
+async def _stream_test(user_id: int, resume_id: int, skills: list, format: str):
+    loop = asyncio.get_running_loop()
+    batches = asyncio.Queue()
+
+    def on_questions(test_id, offset, questions):
+        loop.call_soon_threadsafe(batches.put_nowait, (test_id, offset, questions))
+
+    # Runs to completion (and saves the test) even if the client disconnects
+    task = asyncio.ensure_future(run_in_threadpool(_generate, user_id, resume_id, skills, on_questions))
+    task.add_done_callback(lambda _: batches.put_nowait(None))
+
+    test_id = None
+    sent = 0
+    while True:
+        batch = await batches.get()
+        if batch is None:
+            break
+        batch_test_id, offset, questions = batch
+        if test_id is None:
+            test_id = batch_test_id
+            yield _format_event(format, "test", {"test_id": test_id})
+        yield _format_event(format, "questions", {"questions": _sanitize_questions(questions, offset)})
+        sent += len(questions)
+
+    try:
+        test_id, raw_questions = task.result()
+    except HTTPException as e:
+        yield _format_event(format, "error", {"detail": e.detail})
+        return
+    except Exception as e:
+        yield _format_event(format, "error", {"detail": f"Test generation failed: {str(e)}"})
+        return
+
+    # A reused test, or one generated by a concurrent request we waited on, arrives in one go
+    if sent < len(raw_questions):
+        if sent == 0:
+            yield _format_event(format, "test", {"test_id": test_id})
+        yield _format_event(format, "questions", {"questions": _sanitize_questions(raw_questions[sent:], sent)})
+
+    yield _format_event(format, "done", {"test_id": test_id, "total_questions": len(raw_questions)})
+
+@router.post("/generate/stream")
+async def generate_test_stream(
+    resume_id: int,
+    format: str = Query("ndjson", pattern="^(ndjson|sse)$"),
+    current_user: models.User = Depends(auth.get_current_user),
+    runner: database.SessionRunner = Depends(database.get_runner)
+):
+    """
+    Same test as /generate, delivered as it's generated: a "test" event with the
+    test_id, one "questions" event per batch (ids are final, answers removed),
+    then "done" with the total, or "error". NDJSON by default, or server-sent events.
+    """
+    resume, skills = await runner.run(_resume_skills, resume_id, current_user)
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_test(current_user.id, resume.id, skills, format),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 from pydantic import BaseModel
 
 class TestSubmission(BaseModel):
     answers: dict
     trust_metrics: dict
 
-@router.post("/submit")
-def submit_test(
-    test_id: int,
-    submission: TestSubmission,
-    current_user: models.User = Depends(auth.get_current_user),
-    db: Session = Depends(database.get_db)
-):
+def _grade_and_save(db: Session, test_id: int, submission: TestSubmission, current_user: models.User):
     # 1. Fetch Generated Test
     test_record = db.query(models.GeneratedTest).filter(models.GeneratedTest.id == test_id).first()
     if not test_record:
@@ -144,6 +322,13 @@ def submit_test(
         details=details
     )
     db.add(result)
+    try:
+        db.flush()
+    except IntegrityError:
+        # Unique per resume: a concurrent submission of the same test got there first
+        db.rollback()
+        raise HTTPException(status_code=400, detail="You have already taken the test for this resume. You cannot retake it.")
+    applicant_summary.record_test_result(db, result)
     db.commit()
 
     return {
@@ -153,3 +338,12 @@ def submit_test(
         "total": total_questions,
         "details": details
     }
+
+@router.post("/submit")
+async def submit_test(
+    test_id: int,
+    submission: TestSubmission,
+    current_user: models.User = Depends(auth.get_current_user),
+    runner: database.SessionRunner = Depends(database.get_runner)
+):
+    return await runner.run(_grade_and_save, test_id, submission, current_user)
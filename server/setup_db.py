@@ -1,11 +1,11 @@
-from database import engine, Base
-import models
+import migrate
 
 def init_db():
     print("🔄 Initializing database tables on Supabase...")
     try:
-        # This will create tables if they don't exist
-        Base.metadata.create_all(bind=engine)
+        # Creates missing tables and indexes, backfills derived data (applicant
+        # summaries, resume skills) and records the schema version
+        migrate.upgrade()
         print("✅ Database tables created successfully!")
     except Exception as e:
         print(f"❌ Error creating tables: {e}")
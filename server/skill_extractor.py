@@ -0,0 +1,218 @@
+import datetime
+import re
+from collections import deque
+from skills import ALLOWED_SKILLS
+
+# Local, LLM-free resume analysis: skills via a multi-pattern matcher compiled
+# once at import, experience from the date ranges in the text.
+
+# Extra spellings that map onto an allowed skill
+ALIASES = {
+    "golang": "Go",
+    "cpp": "C++",
+    "c plus plus": "C++",
+    "csharp": "C#",
+    "c sharp": "C#",
+    "ecmascript": "JavaScript",
+    "scala.js": "Scala",
+    "my sql": "MySQL",
+}
+
+# Skills that are also ordinary words or initials. They must match case exactly
+# and sit in list context (e.g. "Python, Go, C") unless spelled via an alias.
+AMBIGUOUS = {"C", "Go"}
+
+# Characters that continue a token: "C" must not match inside "C++", "C#" or "Cython"
+_TOKEN_CHARS = re.compile(r"[\w+#]")
+_LIST_BEFORE = set(",;/|:(*•·▪-\n")
+_LIST_AFTER = set(",;/|)\n")
+
+class _Matcher:
+    """
+    Aho-Corasick automaton over lowercase patterns, flattened into a DFA so a
+    single pass over the text, one dict lookup per character, finds every
+    occurrence of every pattern.
+    """
+
+    def __init__(self, patterns: dict):
+        goto = [{}]
+        output = [[]]
+        for pattern, value in patterns.items():
+            state = 0
+            for ch in pattern:
+                if ch not in goto[state]:
+                    goto.append({})
+                    output.append([])
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            output[state].append((pattern, value))
+
+        # Breadth-first: a state's failure link is always finished before its children,
+        # so each state's transitions are its own edges on top of its failure state's
+        fail = [0] * len(goto)
+        self.delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self.delta[state] = {**self.delta[fail[state]], **goto[state]}
+            for ch, child in goto[state].items():
+                fail[child] = self.delta[fail[state]].get(ch, 0) if state else 0
+                output[child] = output[child] + output[fail[child]]
+                queue.append(child)
+        self.output = [tuple(o) for o in output]
+
+    def finditer(self, text: str):
+        """
+        Yields (start, end, pattern, value) for every match in text (matched case-insensitively).
+        """
+        delta, output = self.delta, self.output
+        state = 0
+        for i, ch in enumerate(text.lower()):
+            state = delta[state].get(ch, 0)
+            if output[state]:
+                for pattern, value in output[state]:
+                    yield i - len(pattern) + 1, i + 1, pattern, value
+
+_matcher = _Matcher({
+    **{skill.lower(): skill for skill in ALLOWED_SKILLS},
+    **ALIASES,
+})
+
+def _is_token(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    # A trailing "." is sentence punctuation unless it continues the token ("Scala.js")
+    if after == "." and end + 1 < len(text) and _TOKEN_CHARS.match(text[end + 1]):
+        return False
+    # Hyphenated words ("Objective-C", "C-suite", "go-to") are not the skill
+    if (before == "-" and start > 1 and text[start - 2].isalpha()) or (after == "-" and end + 1 < len(text) and text[end + 1].isalpha()):
+        return False
+    return not _TOKEN_CHARS.match(before) and not _TOKEN_CHARS.match(after)
+
+def _in_list_context(text: str, start: int, end: int) -> bool:
+    while start > 0 and text[start - 1] in " \t":
+        start -= 1
+    while end < len(text) and text[end] in " \t":
+        end += 1
+    return start == 0 or text[start - 1] in _LIST_BEFORE or end == len(text) or text[end] in _LIST_AFTER
+
+def extract_skills(text: str) -> dict:
+    """
+    Returns {skill: "strong" | "weak"} for allowed skills mentioned in text.
+    Weak means only ambiguous mentions (e.g. a lone "Go" in running prose).
+    """
+    found = {}
+    for start, end, pattern, skill in _matcher.finditer(text):
+        if not _is_token(text, start, end):
+            continue
+        if pattern == skill.lower() and skill in AMBIGUOUS:
+            if text[start:end] != skill:
+                continue
+            strength = "strong" if _in_list_context(text, start, end) else "weak"
+        else:
+            strength = "strong"
+        if found.get(skill) != "strong":
+            found[skill] = strength
+    return found
+
+_MONTHS = {m: i + 1 for i, m in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec")
+)}
+_MONTH = r"(?:(?P<{0}m>jan|feb|mar|apr|may|jun|jul|aug|sept?|oct|nov|dec)[a-z]*\.?\s+|(?<!\d)(?P<{0}n>0?[1-9]|1[0-2])[/.-])"
+# Anchored on the start year so the scan is driven by the regex engine's literal search;
+# an optional start month is then read from just before the match
+_DATE_RANGE = re.compile(
+    r"(?<!\d)(?P<sy>(?:19|20)\d{2})\s*(?:-|–|—|to|until|till)\s*"
+    r"(?:" + _MONTH.format("e") + r"?(?P<ey>(?:19|20)\d{2})|(?P<present>present|current|now|today|date))(?!\d)",
+    re.IGNORECASE
+)
+_START_MONTH = re.compile(_MONTH.format("s") + r"$", re.IGNORECASE)
+_STATED_YEARS = re.compile(
+    r"(?P<years>\d{1,2})\+?\s*(?:years?|yrs?)\.?\s+(?:of\s+)?(?:professional\s+|industry\s+|work\s+)?experience",
+    re.IGNORECASE
+)
+
+def _month(match, prefix: str, default: int) -> int:
+    if match is None:
+        return default
+    name = match.group(prefix + "m")
+    if name:
+        return _MONTHS[name[:3].lower()]
+    number = match.group(prefix + "n")
+    return int(number) if number else default
+
+def estimate_experience(text: str, today: datetime.date = None):
+    """
+    Returns (years, evidence) where evidence is "stated", "dates" or None.
+    An explicit "N years of experience" wins; otherwise the date ranges in the
+    text are merged (overlapping jobs count once) and summed.
+    """
+    stated = [int(m.group("years")) for m in _STATED_YEARS.finditer(text)]
+    if stated:
+        return max(stated), "stated"
+
+    today = today or datetime.date.today()
+    current = today.year * 12 + today.month - 1
+    intervals = []
+    for m in _DATE_RANGE.finditer(text):
+        start_month = _START_MONTH.search(text, max(0, m.start() - 12), m.start())
+        start = int(m.group("sy")) * 12 + _month(start_month, "s", 1) - 1
+        if m.group("present"):
+            end = current
+        else:
+            end = int(m.group("ey")) * 12 + _month(m, "e", 12) - 1
+        end = min(end, current)
+        if end >= start:
+            intervals.append((start, end + 1)) # Month-granular, end inclusive
+    if not intervals:
+        return 0, None
+
+    intervals.sort()
+    total = 0
+    span_start, span_end = intervals[0]
+    for start, end in intervals[1:]:
+        if start > span_end:
+            total += span_end - span_start
+            span_start, span_end = start, end
+        else:
+            span_end = max(span_end, end)
+    total += span_end - span_start
+    return total // 12, "dates"
+
+_SUMMARY_HEADER = re.compile(r"^\s*(?:professional\s+)?(?:summary|profile|objective|about(?:\s+me)?)\s*:?\s*$", re.IGNORECASE | re.MULTILINE)
+
+def extractive_summary(text: str, max_chars: int = 300) -> str:
+    """
+    The opening of the resume's summary/profile section, or "" if it has none.
+    """
+    header = _SUMMARY_HEADER.search(text)
+    if not header:
+        return ""
+    body = " ".join(text[header.end():].strip().split("\n\n")[0].split())
+    if len(body) <= max_chars:
+        return body
+    return body[:max_chars].rsplit(" ", 1)[0] + "..."
+
+def analyze(text: str) -> dict:
+    """
+    Rule-based parse in the same shape as the LLM's, plus a 0-1 confidence:
+    half for finding skills unambiguously, half for finding experience evidence.
+    """
+    skills = extract_skills(text or "")
+    years, evidence = estimate_experience(text or "")
+
+    if any(strength == "strong" for strength in skills.values()):
+        skill_confidence = 1.0
+    elif skills:
+        skill_confidence = 0.5
+    else:
+        skill_confidence = 0.0
+    experience_confidence = 1.0 if evidence else 0.0
+
+    return {
+        # Weak-only mentions are left for the LLM to confirm
+        "skills": [s for s in ALLOWED_SKILLS if skills.get(s) == "strong"],
+        "experience_years": years,
+        "summary": extractive_summary(text or ""),
+        "confidence": 0.5 * skill_confidence + 0.5 * experience_confidence,
+    }
@@ -0,0 +1,18 @@
+# Skill vocabulary shared by resume parsing, storage and recruiter search.
+ALLOWED_SKILLS = ["Python", "C++", "Java", "Scala", "JavaScript", "C", "C#", "Ruby", "PHP", "Swift", "Kotlin", "Go", "Rust", "TypeScript", "MySQL"]
+
+def normalize_skill(name: str) -> str:
+    """
+    Canonical lookup key for a skill name ("  TypeScript " -> "typescript").
+    """
+    return " ".join(str(name).split()).lower()
+
+def matching_skill_keys(search: str) -> list:
+    """
+    Expands a recruiter's substring search into the exact skill keys it matches,
+    so the lookup can use the resume_skills index instead of a LIKE scan.
+    """
+    needle = normalize_skill(search)
+    keys = {normalize_skill(s) for s in ALLOWED_SKILLS if needle in normalize_skill(s)}
+    keys.add(needle)
+    return sorted(keys)
@@ -1,13 +1,66 @@
+import logging
 import os
-from supabase import create_client, Client
+import time
 from dotenv import load_dotenv
+from clients import registry
+import metrics
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+UPLOAD_SECONDS = metrics.Histogram(
+    "supabase_upload_duration_seconds", "Resume uploads to Supabase Storage.",
+    ("outcome",), buckets=metrics.SLOW_BUCKETS
+)
+
 url: str = os.getenv("SUPABASE_URL")
 key: str = os.getenv("SUPABASE_KEY")
+# supabase | stub (offline, for load tests and local runs)
+STORAGE_PROVIDER = os.getenv("STORAGE_PROVIDER", "supabase").lower()
+
+class _StubBucket:
+    def __init__(self, bucket_name: str, latency_ms: float):
+        self.bucket_name = bucket_name
+        self.latency_ms = latency_ms
+
+    def upload(self, path, file, file_options=None):
+        time.sleep(self.latency_ms / 1000) # Stands in for the network round trip
+        return {"path": path}
+
+    def get_public_url(self, path):
+        return f"https://storage.stub.local/{self.bucket_name}/{path}"
+
+class _StubStorage:
+    def __init__(self, latency_ms: float):
+        self.latency_ms = latency_ms
+
+    def from_(self, bucket_name: str):
+        return _StubBucket(bucket_name, self.latency_ms)
+
+    def list_buckets(self):
+        return []
+
+class StubStorageClient:
+    """
+    Accepts uploads without storing them and returns made-up public URLs, with
+    STORAGE_STUB_LATENCY_MS of simulated latency per upload.
+    """
+
+    def __init__(self, latency_ms: float = None):
+        latency_ms = float(os.getenv("STORAGE_STUB_LATENCY_MS", "50")) if latency_ms is None else latency_ms
+        self.storage = _StubStorage(latency_ms)
+
+def _create_client():
+    if STORAGE_PROVIDER == "stub":
+        return StubStorageClient()
+    from supabase import create_client # Heavy import, only paid when storage is first used
+    return create_client(url, key)
+
+registry.register("supabase", _create_client, health_check=lambda client: client.storage.list_buckets())
 
-supabase: Client = create_client(url, key)
+def get_supabase():
+    return registry.get("supabase")
 
 def upload_to_supabase(file_obj, filename: str, bucket_name: str = "resumes") -> str:
     """
@@ -27,16 +80,18 @@ def upload_to_supabase(file_obj, filename: str, bucket_name: str = "resumes") ->
             content_type = "text/plain"
 
         # 'upsert': 'true' to overwrite
-        res = supabase.storage.from_(bucket_name).upload(
-            path=filename,
-            file=file_content,
-            file_options={"content-type": content_type, "upsert": "true"}
-        )
+        supabase = get_supabase()
+        with UPLOAD_SECONDS.time():
+            res = supabase.storage.from_(bucket_name).upload(
+                path=filename,
+                file=file_content,
+                file_options={"content-type": content_type, "upsert": "true"}
+            )
         
         # Get Public URL
         public_url_res = supabase.storage.from_(bucket_name).get_public_url(filename)
         return public_url_res
         
     except Exception as e:
-        print(f"Supabase Upload Error: {e}")
+        logger.warning("Supabase upload failed: %s", e, extra={"bucket": bucket_name, "object": filename})
         raise e